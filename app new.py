@@ -1,550 +1,594 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
-import numpy as np
+import os
+
+from dorenth import profiling
+from dorenth.charts import valuation_histogram
+from dorenth.data import open_data_source
+from dorenth.export import MAX_DOWNLOAD_CELLS, MIME_TYPES, frame_rows, panel_cells, panel_rows, spool_export
+from dorenth.formulas import FormulaError, load_formulas
+from dorenth.growth import GROWTH_METRICS
+from dorenth.metrics import derive_industry_aggregates
+from dorenth.peers import target_features
+from dorenth.pipeline import build_app_graph
+from dorenth.proforma import MIN_EARNINGS_YIELD, screen_pairs
+from dorenth.search import FILTER_METRICS
+from dorenth.valuation import comparable_multiples, simulate_valuation
 
 st.set_page_config(
     page_title="M&A Decision Support Tool - Indonesian Companies",
     layout="wide"
 )
 
-# --- Embedded Financial Data for M&A Analysis ---
-def get_embedded_ma_data():
+@st.cache_resource
+def load_data_source():
     """
-    Embedded financial data for M&A decision making
-    Data includes key M&A metrics: EBITDA, Revenue, Enterprise Value, 
-    Market Cap, Net Income, Total Assets, Total Debt, Cash, 
-    EV/EBITDA Multiple, P/E Ratio, Debt/EBITDA, ROE
+    Dataset shared by every session in this process.
+    Workbooks under MA_DATA_DIR are ingested and watched for changes when it is set
+    (polled every MA_RELOAD_INTERVAL seconds); otherwise the embedded data is used.
+    Parsed workbooks are cached in MA_CACHE_DIR (default: <data dir>/.ma_cache).
+    MA_SHARED_MEMORY=1 places panel values in shared memory so several server processes
+    on one host map a single copy; by default each process keeps a private copy.
     """
-    from collections import OrderedDict
-    
-    # Food Industry Companies
-    food_companies = OrderedDict({
-        "PT_Indofood_Sukses_Makmur_INDF": {
-            "EBITDA": [18.7, 19.6, 20.6, 21.6, 22.7],  # Trillion IDR
-            "Revenue": [76.6, 80.4, 84.4, 88.6, 93.0],
-            "Enterprise_Value": [156.2, 164.0, 172.2, 180.8, 189.8],
-            "Market_Cap": [125.4, 131.7, 138.3, 145.2, 152.5],
-            "Net_Income": [4.2, 4.4, 4.6, 4.8, 5.1],
-            "Total_Assets": [89.3, 93.8, 98.5, 103.4, 108.6],
-            "Total_Debt": [35.8, 37.6, 39.5, 41.5, 43.6],
-            "Cash": [12.5, 13.1, 13.8, 14.5, 15.2],
-            "EV_EBITDA_Multiple": [8.4, 8.4, 8.4, 8.4, 8.4],
-            "PE_Ratio": [29.9, 30.0, 30.1, 30.2, 30.0],
-            "Debt_EBITDA_Ratio": [1.9, 1.9, 1.9, 1.9, 1.9],
-            "ROE_Percent": [16.2, 16.5, 16.8, 17.1, 17.4]
-        },
-        "PT_Unilever_Indonesia_UNVR": {
-            "EBITDA": [8.9, 9.3, 9.8, 10.3, 10.8],
-            "Revenue": [41.2, 43.3, 45.5, 47.8, 50.2],
-            "Enterprise_Value": [89.0, 93.5, 98.2, 103.1, 108.3],
-            "Market_Cap": [87.5, 91.9, 96.5, 101.3, 106.4],
-            "Net_Income": [7.2, 7.6, 8.0, 8.4, 8.8],
-            "Total_Assets": [18.5, 19.4, 20.4, 21.4, 22.5],
-            "Total_Debt": [2.1, 2.2, 2.3, 2.4, 2.5],
-            "Cash": [4.6, 4.8, 5.1, 5.3, 5.6],
-            "EV_EBITDA_Multiple": [10.0, 10.1, 10.0, 10.0, 10.0],
-            "PE_Ratio": [12.2, 12.1, 12.1, 12.1, 12.1],
-            "Debt_EBITDA_Ratio": [0.2, 0.2, 0.2, 0.2, 0.2],
-            "ROE_Percent": [21.0, 21.3, 21.6, 21.9, 22.2]
-        },
-        "PT_Mayora_Indah_MYOR": {
-            "EBITDA": [3.2, 3.4, 3.6, 3.8, 4.0],
-            "Revenue": [24.8, 26.0, 27.3, 28.7, 30.1],
-            "Enterprise_Value": [28.8, 30.2, 31.7, 33.3, 35.0],
-            "Market_Cap": [26.5, 27.8, 29.2, 30.7, 32.2],
-            "Net_Income": [1.8, 1.9, 2.0, 2.1, 2.2],
-            "Total_Assets": [19.2, 20.2, 21.2, 22.3, 23.4],
-            "Total_Debt": [4.5, 4.7, 4.9, 5.2, 5.4],
-            "Cash": [2.2, 2.3, 2.4, 2.5, 2.6],
-            "EV_EBITDA_Multiple": [9.0, 8.9, 8.8, 8.8, 8.8],
-            "PE_Ratio": [14.7, 14.6, 14.6, 14.6, 14.6],
-            "Debt_EBITDA_Ratio": [1.4, 1.4, 1.4, 1.4, 1.4],
-            "ROE_Percent": [18.5, 18.8, 19.1, 19.4, 19.7]
-        },
-        "PT_Garudafood_Putra_Putri_Jaya_GOOD": {
-            "EBITDA": [1.8, 1.9, 2.0, 2.1, 2.2],
-            "Revenue": [12.4, 13.0, 13.7, 14.4, 15.1],
-            "Enterprise_Value": [18.5, 19.4, 20.4, 21.4, 22.5],
-            "Market_Cap": [16.8, 17.6, 18.5, 19.4, 20.4],
-            "Net_Income": [0.9, 0.9, 1.0, 1.1, 1.1],
-            "Total_Assets": [9.5, 10.0, 10.5, 11.0, 11.6],
-            "Total_Debt": [2.8, 2.9, 3.1, 3.2, 3.4],
-            "Cash": [1.1, 1.2, 1.2, 1.3, 1.4],
-            "EV_EBITDA_Multiple": [10.3, 10.2, 10.2, 10.2, 10.2],
-            "PE_Ratio": [18.7, 18.6, 18.5, 18.4, 18.5],
-            "Debt_EBITDA_Ratio": [1.6, 1.5, 1.6, 1.5, 1.5],
-            "ROE_Percent": [15.8, 16.1, 16.4, 16.7, 17.0]
-        },
-        "PT_Nippon_Indosari_Corpindo_ROTI": {
-            "EBITDA": [1.2, 1.3, 1.4, 1.5, 1.6],
-            "Revenue": [8.9, 9.3, 9.8, 10.3, 10.8],
-            "Enterprise_Value": [12.5, 13.1, 13.8, 14.5, 15.2],
-            "Market_Cap": [11.2, 11.8, 12.4, 13.0, 13.7],
-            "Net_Income": [0.5, 0.5, 0.6, 0.6, 0.7],
-            "Total_Assets": [6.8, 7.1, 7.5, 7.9, 8.3],
-            "Total_Debt": [2.1, 2.2, 2.3, 2.4, 2.5],
-            "Cash": [0.8, 0.8, 0.9, 0.9, 1.0],
-            "EV_EBITDA_Multiple": [10.4, 10.1, 9.9, 9.7, 9.5],
-            "PE_Ratio": [22.4, 22.4, 22.1, 21.7, 21.4],
-            "Debt_EBITDA_Ratio": [1.8, 1.7, 1.6, 1.6, 1.6],
-            "ROE_Percent": [14.2, 14.5, 14.8, 15.1, 15.4]
-        }
-    })
-    
-    # Chemical Industry Companies
-    chemical_companies = OrderedDict({
-        "PT_Chandra_Asri_Petrochemical_TPIA": {
-            "EBITDA": [8.5, 9.2, 10.1, 11.2, 12.5],
-            "Revenue": [45.8, 52.7, 60.6, 69.7, 80.2],
-            "Enterprise_Value": [68.0, 73.4, 79.3, 85.6, 92.5],
-            "Market_Cap": [58.2, 62.8, 67.8, 73.2, 79.1],
-            "Net_Income": [3.2, 3.8, 4.5, 5.4, 6.4],
-            "Total_Assets": [38.5, 41.6, 45.0, 48.6, 52.5],
-            "Total_Debt": [15.2, 16.4, 17.7, 19.1, 20.6],
-            "Cash": [5.4, 5.8, 6.3, 6.8, 7.3],
-            "EV_EBITDA_Multiple": [8.0, 8.0, 7.9, 7.6, 7.4],
-            "PE_Ratio": [18.2, 16.5, 15.1, 13.6, 12.4],
-            "Debt_EBITDA_Ratio": [1.8, 1.8, 1.8, 1.7, 1.6],
-            "ROE_Percent": [19.5, 20.2, 21.1, 22.2, 23.5]
-        },
-        "PT_Barito_Pacific_BRPT": {
-            "EBITDA": [6.2, 6.8, 7.5, 8.3, 9.2],
-            "Revenue": [28.7, 33.0, 38.0, 43.7, 50.3],
-            "Enterprise_Value": [52.4, 56.6, 61.1, 66.0, 71.3],
-            "Market_Cap": [45.8, 49.4, 53.4, 57.7, 62.3],
-            "Net_Income": [2.5, 2.9, 3.4, 4.0, 4.7],
-            "Total_Assets": [35.2, 38.0, 41.1, 44.4, 48.0],
-            "Total_Debt": [11.8, 12.7, 13.7, 14.8, 16.0],
-            "Cash": [5.2, 5.6, 6.1, 6.6, 7.1],
-            "EV_EBITDA_Multiple": [8.5, 8.3, 8.1, 8.0, 7.8],
-            "PE_Ratio": [18.3, 17.0, 15.7, 14.4, 13.2],
-            "Debt_EBITDA_Ratio": [1.9, 1.9, 1.8, 1.8, 1.7],
-            "ROE_Percent": [17.8, 18.5, 19.3, 20.2, 21.2]
-        },
-        "PT_Petrokimia_Gresik_PGJO": {
-            "EBITDA": [2.8, 3.1, 3.4, 3.8, 4.2],
-            "Revenue": [15.6, 17.9, 20.6, 23.7, 27.2],
-            "Enterprise_Value": [22.4, 24.2, 26.1, 28.2, 30.4],
-            "Market_Cap": [20.1, 21.7, 23.4, 25.3, 27.3],
-            "Net_Income": [1.1, 1.3, 1.5, 1.8, 2.1],
-            "Total_Assets": [12.8, 13.8, 14.9, 16.1, 17.4],
-            "Total_Debt": [4.2, 4.5, 4.9, 5.3, 5.7],
-            "Cash": [1.9, 2.0, 2.2, 2.4, 2.6],
-            "EV_EBITDA_Multiple": [8.0, 7.8, 7.7, 7.4, 7.2],
-            "PE_Ratio": [18.3, 16.7, 15.6, 14.1, 13.0],
-            "Debt_EBITDA_Ratio": [1.5, 1.5, 1.4, 1.4, 1.4],
-            "ROE_Percent": [16.2, 17.1, 18.0, 19.1, 20.3]
-        },
-        "PT_Lautan_Luas_LTLS": {
-            "EBITDA": [1.8, 2.0, 2.2, 2.5, 2.8],
-            "Revenue": [12.4, 14.3, 16.4, 18.9, 21.7],
-            "Enterprise_Value": [15.2, 16.4, 17.7, 19.1, 20.6],
-            "Market_Cap": [13.8, 14.9, 16.1, 17.4, 18.8],
-            "Net_Income": [0.8, 0.9, 1.1, 1.3, 1.5],
-            "Total_Assets": [8.9, 9.6, 10.4, 11.2, 12.1],
-            "Total_Debt": [2.6, 2.8, 3.0, 3.2, 3.5],
-            "Cash": [1.2, 1.3, 1.4, 1.5, 1.7],
-            "EV_EBITDA_Multiple": [8.4, 8.2, 8.0, 7.6, 7.4],
-            "PE_Ratio": [17.3, 16.6, 14.6, 13.4, 12.5],
-            "Debt_EBITDA_Ratio": [1.4, 1.4, 1.4, 1.3, 1.3],
-            "ROE_Percent": [18.5, 19.2, 20.1, 21.2, 22.4]
-        },
-        "PT_Indocement_Tunggal_Prakarsa_INTP": {
-            "EBITDA": [5.4, 5.8, 6.3, 6.8, 7.4],
-            "Revenue": [18.9, 20.4, 22.0, 23.8, 25.7],
-            "Enterprise_Value": [43.2, 46.6, 50.3, 54.3, 58.7],
-            "Market_Cap": [41.5, 44.8, 48.4, 52.3, 56.5],
-            "Net_Income": [2.1, 2.3, 2.5, 2.7, 2.9],
-            "Total_Assets": [28.7, 31.0, 33.5, 36.2, 39.1],
-            "Total_Debt": [3.2, 3.5, 3.8, 4.1, 4.4],
-            "Cash": [1.5, 1.7, 1.9, 2.0, 2.2],
-            "EV_EBITDA_Multiple": [8.0, 8.0, 8.0, 8.0, 7.9],
-            "PE_Ratio": [19.8, 19.5, 19.4, 19.3, 19.5],
-            "Debt_EBITDA_Ratio": [0.6, 0.6, 0.6, 0.6, 0.6],
-            "ROE_Percent": [15.2, 15.8, 16.4, 17.1, 17.8]
-        }
-    })
-    
-    # Mobility/Transportation Industry Companies
-    mobility_companies = OrderedDict({
-        "PT_Astra_International_ASII": {
-            "EBITDA": [28.5, 30.8, 33.3, 36.0, 38.9],
-            "Revenue": [185.9, 201.0, 217.1, 234.5, 253.3],
-            "Enterprise_Value": [285.0, 308.1, 332.7, 359.3, 388.1],
-            "Market_Cap": [295.4, 319.2, 344.8, 372.4, 402.1],
-            "Net_Income": [12.8, 13.8, 14.9, 16.1, 17.4],
-            "Total_Assets": [295.4, 319.2, 344.8, 372.4, 402.1],
-            "Total_Debt": [98.2, 106.1, 114.6, 123.8, 133.7],
-            "Cash": [108.6, 117.3, 126.8, 137.0, 148.0],
-            "EV_EBITDA_Multiple": [10.0, 10.0, 10.0, 10.0, 10.0],
-            "PE_Ratio": [23.1, 23.1, 23.1, 23.1, 23.1],
-            "Debt_EBITDA_Ratio": [3.4, 3.4, 3.4, 3.4, 3.4],
-            "ROE_Percent": [14.8, 15.1, 15.4, 15.7, 16.0]
-        },
-        "PT_United_Tractors_UNTR": {
-            "EBITDA": [9.8, 10.8, 11.9, 13.1, 14.4],
-            "Revenue": [68.7, 75.6, 83.2, 91.5, 100.7],
-            "Enterprise_Value": [78.4, 86.2, 94.8, 104.3, 114.7],
-            "Market_Cap": [85.2, 93.7, 103.1, 113.4, 124.8],
-            "Net_Income": [4.9, 5.4, 5.9, 6.5, 7.2],
-            "Total_Assets": [98.5, 108.4, 119.2, 131.1, 144.2],
-            "Total_Debt": [25.6, 28.2, 31.0, 34.1, 37.5],
-            "Cash": [32.4, 35.6, 39.2, 43.1, 47.4],
-            "EV_EBITDA_Multiple": [8.0, 8.0, 8.0, 8.0, 8.0],
-            "PE_Ratio": [17.4, 17.4, 17.5, 17.4, 17.3],
-            "Debt_EBITDA_Ratio": [2.6, 2.6, 2.6, 2.6, 2.6],
-            "ROE_Percent": [18.2, 18.5, 18.8, 19.1, 19.4]
-        },
-        "PT_Garuda_Indonesia_GIAA": {
-            "EBITDA": [3.2, 3.8, 4.6, 5.5, 6.6],
-            "Revenue": [28.9, 34.7, 41.6, 49.9, 59.9],
-            "Enterprise_Value": [45.6, 48.2, 51.0, 53.9, 57.0],
-            "Market_Cap": [25.4, 27.5, 29.8, 32.3, 35.0],
-            "Net_Income": [-2.1, -1.5, -0.8, 0.2, 1.5],
-            "Total_Assets": [89.5, 94.0, 98.7, 103.6, 108.8],
-            "Total_Debt": [78.9, 82.8, 87.0, 91.4, 95.9],
-            "Cash": [12.7, 13.3, 14.0, 14.7, 15.4],
-            "EV_EBITDA_Multiple": [14.3, 12.7, 11.1, 9.8, 8.6],
-            "PE_Ratio": [-12.1, -18.3, -37.3, 161.5, 23.3],
-            "Debt_EBITDA_Ratio": [24.7, 21.8, 18.9, 16.6, 14.5],
-            "ROE_Percent": [-25.4, -18.2, -12.8, 2.5, 15.8]
-        },
-        "PT_Blue_Bird_BIRD": {
-            "EBITDA": [1.8, 2.1, 2.5, 3.0, 3.6],
-            "Revenue": [6.2, 7.4, 8.9, 10.7, 12.8],
-            "Enterprise_Value": [12.6, 13.6, 14.7, 15.9, 17.2],
-            "Market_Cap": [8.9, 9.6, 10.4, 11.2, 12.1],
-            "Net_Income": [0.4, 0.5, 0.7, 0.9, 1.2],
-            "Total_Assets": [15.2, 16.4, 17.7, 19.1, 20.6],
-            "Total_Debt": [8.5, 9.2, 9.9, 10.7, 11.6],
-            "Cash": [4.8, 5.2, 5.6, 6.1, 6.6],
-            "EV_EBITDA_Multiple": [7.0, 6.5, 5.9, 5.3, 4.8],
-            "PE_Ratio": [22.3, 19.2, 14.9, 12.4, 10.1],
-            "Debt_EBITDA_Ratio": [4.7, 4.4, 4.0, 3.6, 3.2],
-            "ROE_Percent": [12.5, 13.8, 15.3, 17.1, 19.2]
-        },
-        "PT_Adi_Sarana_Armada_ASSA": {
-            "EBITDA": [2.5, 2.8, 3.2, 3.6, 4.1],
-            "Revenue": [12.8, 14.7, 16.9, 19.4, 22.3],
-            "Enterprise_Value": [18.5, 20.0, 21.6, 23.3, 25.2],
-            "Market_Cap": [15.2, 16.4, 17.7, 19.1, 20.6],
-            "Net_Income": [1.1, 1.3, 1.5, 1.8, 2.1],
-            "Total_Assets": [25.6, 27.6, 29.8, 32.2, 34.8],
-            "Total_Debt": [8.9, 9.6, 10.4, 11.2, 12.1],
-            "Cash": [5.6, 6.0, 6.5, 7.0, 7.6],
-            "EV_EBITDA_Multiple": [7.4, 7.1, 6.8, 6.5, 6.1],
-            "PE_Ratio": [13.8, 12.6, 11.8, 10.6, 9.8],
-            "Debt_EBITDA_Ratio": [3.6, 3.4, 3.3, 3.1, 3.0],
-            "ROE_Percent": [16.8, 17.5, 18.3, 19.2, 20.2]
-        }
-    })
-    
-    # Combine all industries
-    all_companies = {
-        "Food": food_companies,
-        "Chemical": chemical_companies,
-        "Mobility": mobility_companies
-    }
-    
-    years = [2020, 2021, 2022, 2023, 2024]
-    
-    # Convert to dataframe format similar to original
-    formatted_data = {}
-    
-    for industry, companies in all_companies.items():
-        for company_name, company_data in companies.items():
-            # Create dataframe in the same format as original
-            rows = [
-                [0, "Year"] + [str(y) for y in years],
-                [0, ""] + [str(y) for y in years]
-            ]
-            
-            for metric, values in company_data.items():
-                row = [0, metric] + values
-                rows.append(row)
-            
-            df = pd.DataFrame(rows)
-            formatted_data[f"{industry}_{company_name}"] = df
-    
-    return formatted_data
+    return open_data_source(
+        data_dir=os.environ.get("MA_DATA_DIR"),
+        cache_dir=os.environ.get("MA_CACHE_DIR"),
+        interval=float(os.environ.get("MA_RELOAD_INTERVAL", "10")),
+        derive=derive_industry_aggregates,
+        share=os.environ.get("MA_SHARED_MEMORY", "0") != "0"
+    )
 
-# --- M&A Specific Metric Extraction ---
-def extract_metric(df, metric_name):
-    """Extract specific metric data from company dataframe"""
-    df[1] = df[1].astype(str)
-    
-    # Extract years from the first row
-    year_row = df.iloc[0, 2:].tolist()
-    years = [str(int(y)) if str(y).replace('.', '').isdigit() else y for y in year_row]
-    
-    # Find the metric row
-    match_row = df[df[1].str.lower().str.strip() == metric_name.lower().strip()]
-    
-    if not match_row.empty:
-        values = match_row.iloc[0, 2:].tolist()
-        min_len = min(len(values), len(years))
-        return pd.DataFrame({"Year": years[:min_len], "Value": values[:min_len]})
-    else:
-        return pd.DataFrame({"Year": years, "Value": [None] * len(years)})
+@st.cache_resource
+def load_formula_set():
+    """Derived-metric formulas: the defaults plus any in the JSON file named by MA_FORMULAS_FILE"""
+    return load_formulas(os.environ.get("MA_FORMULAS_FILE"))
 
-# --- M&A Valuation Functions ---
-def calculate_ma_metrics(company_data, selected_companies):
-    """Calculate M&A relevant metrics for selected companies"""
-    ma_summary = []
-    
-    for company in selected_companies:
-        if company in company_data:
-            df = company_data[company]
-            
-            # Extract latest year data
-            ebitda = extract_metric(df, "EBITDA")
-            revenue = extract_metric(df, "Revenue")
-            ev = extract_metric(df, "Enterprise_Value")
-            market_cap = extract_metric(df, "Market_Cap")
-            ev_ebitda = extract_metric(df, "EV_EBITDA_Multiple")
-            debt_ebitda = extract_metric(df, "Debt_EBITDA_Ratio")
-            roe = extract_metric(df, "ROE_Percent")
-            
-            if not ebitda.empty and not ev.empty:
-                latest_data = {
-                    "Company": company.replace("_", " ").replace("Food ", "").replace("Chemical ", "").replace("Mobility ", ""),
-                    "Industry": company.split("_")[0],
-                    "EBITDA_2024": float(ebitda.iloc[-1]["Value"]) if len(ebitda) > 0 else 0,
-                    "Revenue_2024": float(revenue.iloc[-1]["Value"]) if len(revenue) > 0 else 0,
-                    "Enterprise_Value_2024": float(ev.iloc[-1]["Value"]) if len(ev) > 0 else 0,
-                    "Market_Cap_2024": float(market_cap.iloc[-1]["Value"]) if len(market_cap) > 0 else 0,
-                    "EV_EBITDA_Multiple": float(ev_ebitda.iloc[-1]["Value"]) if len(ev_ebitda) > 0 else 0,
-                    "Debt_EBITDA_Ratio": float(debt_ebitda.iloc[-1]["Value"]) if len(debt_ebitda) > 0 else 0,
-                    "ROE_Percent": float(roe.iloc[-1]["Value"]) if len(roe) > 0 else 0
-                }
-                ma_summary.append(latest_data)
-    
-    return pd.DataFrame(ma_summary)
+@st.cache_resource
+def load_compute_graph():
+    """
+    Summary, growth, trend, figure, valuation and insights stages shared by every session.
+    Each keeps its recent results keyed on its own inputs, so a rerun only recomputes
+    the stages whose inputs changed.
+    """
+    return build_app_graph()
 
-# --- App Interface ---
-st.title("M&A Decision Support Tool - Indonesian Companies")
-st.markdown("**Comprehensive M&A Analysis for Food, Chemical, and Mobility Industries**")
+# Opt-in profiling of this rerun: MA_PROFILE=1 for every session, or ?profile=1 in the URL
+profile_enabled = os.environ.get("MA_PROFILE", "0") != "0" or st.query_params.get("profile") == "1"
+profiler = profiling.Profiler().start() if profile_enabled else None
+sampler = None
+if profiler is not None and st.session_state.pop("profile_sample_next", False):
+    sampler = profiling.Sampler().start()
 
-# Load embedded data
-company_data = get_embedded_ma_data()
-st.success(f"✅ Loaded financial data for {len(company_data)} companies across 3 industries")
+# Everything up to the diagnostics runs in try, so profiling ends however the rerun does:
+# completed, stopped with st.stop(), interrupted by a widget change or failed
+try:
+    # --- App Interface ---
+    st.title("M&A Decision Support Tool - Indonesian Companies")
+    st.markdown("**Comprehensive M&A Analysis for Food, Chemical, and Mobility Industries**")
 
-# Industry and Company Selection
-st.header("1. Select Target Industries & Companies")
+    # Load company data; one snapshot per rerun so every section sees the same version
+    profiling.section("Load Data")
+    snapshot = load_data_source().snapshot()
+    graph = load_compute_graph()
+    company_data, load_errors = snapshot.panel, snapshot.errors
+    st.success(f"✅ Loaded financial data for {len(company_data)} companies across {len(company_data.industries)} industries")
 
-col1, col2 = st.columns(2)
+    if load_errors:
+        with st.expander(f"⚠️ {len(load_errors)} workbook(s) could not be loaded"):
+            st.dataframe(pd.DataFrame(load_errors), use_container_width=True)
 
-with col1:
-    selected_industries = st.multiselect(
-        "Select Industries:",
-        ["Food", "Chemical", "Mobility"],
-        default=["Food", "Chemical", "Mobility"]
-    )
+    # Nothing to index or analyse until at least one workbook loads
+    if len(company_data) == 0 or len(company_data.years) == 0:
+        st.warning("No company data loaded yet. Add workbooks to the data folder; it is checked for changes while the app runs.")
+        st.stop()
 
-# Filter companies based on selected industries
-available_companies = [comp for comp in company_data.keys() 
-                      if any(industry in comp for industry in selected_industries)]
+    # Industry and Company Selection
+    profiling.section("1. Select Target Industries & Companies")
+    st.header("1. Select Target Industries & Companies")
 
-with col2:
-    selected_companies = st.multiselect(
-        "Select Companies for Analysis:",
-        available_companies,
-        default=available_companies[:5]  # Default to first 5
-    )
+    # Longest company list handed to the selector; search and filters narrow the rest
+    MAX_COMPANY_OPTIONS = 500
+
+    company_index = graph.get("company_index", company_data)
+    latest_year = int(company_data.years[-1])
 
-if selected_companies:
-    # M&A Summary Dashboard
-    st.header("2. M&A Valuation Dashboard")
-    
-    ma_summary_df = calculate_ma_metrics(company_data, selected_companies)
-    
-    if not ma_summary_df.empty:
-        # Display M&A Summary Table
-        st.subheader("M&A Valuation Summary (2024)")
-        st.dataframe(ma_summary_df, use_container_width=True)
-        
-    # M&A Metric Analysis
-    st.header("3. Detailed M&A Metric Analysis")
-    
-    # Get available M&A metrics
-    ma_metrics = [
-        "EBITDA", "Revenue", "Enterprise_Value", "Market_Cap", 
-        "Net_Income", "Total_Assets", "Total_Debt", "Cash",
-        "EV_EBITDA_Multiple", "PE_Ratio", "Debt_EBITDA_Ratio", "ROE_Percent"
-    ]
-    
     col1, col2 = st.columns(2)
-    
+
     with col1:
-        selected_metric = st.selectbox(
-            "Select M&A Metric for Trend Analysis:",
-            ma_metrics,
-            index=0  # Default to EBITDA
+        selected_industries = st.multiselect(
+            "Select Industries:",
+            company_data.industries,
+            default=company_data.industries
         )
     
+        range_metrics = st.multiselect(f"Filter on Metric Ranges ({latest_year}):", FILTER_METRICS)
+        metric_ranges = []
+        for metric in range_metrics:
+            low_col, high_col = st.columns(2)
+            with low_col:
+                low = st.number_input(f"Min {metric}:", value=None)
+            with high_col:
+                high = st.number_input(f"Max {metric}:", value=None)
+            metric_ranges.append((metric, low, high))
+
     with col2:
-        chart_type = st.selectbox(
-            "Chart Type:",
-            ["Line Chart", "Bar Chart", "Box Plot"],
-            index=0
+        company_query = st.text_input("Search Companies (name or ticker):", placeholder="e.g. indo or UNVR")
+
+    # Filter companies based on selected industries, search and metric ranges
+    available_codes = company_index.filter(
+        company_index.industry_codes(selected_industries),
+        company_query,
+        metric_ranges,
+        latest_year
+    )
+    available_companies = [company_data.companies[c] for c in available_codes[:MAX_COMPANY_OPTIONS]]
+
+    # Earlier picks stay selected while searching, unless their industry is dropped
+    previous_selection = st.session_state.get("company_selection")
+    if previous_selection is None:
+        default_companies = available_companies[:5]  # Default to first 5
+    else:
+        default_companies = [comp for comp in previous_selection
+                             if comp in company_data and company_data.industry_of(comp) in selected_industries]
+
+    with col2:
+        selected_companies = st.multiselect(
+            "Select Companies for Analysis:",
+            list(dict.fromkeys(default_companies + available_companies)),
+            default=default_companies
         )
     
-    # Create trend analysis
-    st.subheader(f"Trend Analysis: {selected_metric}")
+        if len(available_codes) > MAX_COMPANY_OPTIONS:
+            st.caption(f"Showing the first {MAX_COMPANY_OPTIONS} of {len(available_codes):,} matching companies; search to narrow the list")
+
+    st.session_state["company_selection"] = selected_companies
+
+    if selected_companies:
+        # M&A Summary Dashboard
+        profiling.section("2. M&A Valuation Dashboard")
+        st.header("2. M&A Valuation Dashboard")
+    
+        col1, col2 = st.columns(2)
     
-    plot_df = pd.DataFrame()
+        with col1:
+            as_of_year = st.selectbox(
+                "As-of Year:",
+                [int(y) for y in company_data.years[::-1]],
+                index=0  # Default to latest year
+            )
+    
+        with col2:
+            growth_windows = list(range(1, max(2, len(company_data.years))))
+            growth_window = st.selectbox(
+                "Growth Window (years):",
+                growth_windows,
+                index=min(3, growth_windows[-1]) - 1  # Default to 3-year CAGR
+            )
     
-    for company in selected_companies:
-        if company in company_data:
-            extracted = extract_metric(company_data[company], selected_metric)
-            if not extracted.empty:
-                extracted["Company"] = company.replace("_", " ").replace("Food ", "").replace("Chemical ", "").replace("Mobility ", "")
-                extracted["Industry"] = company.split("_")[0]
-                plot_df = pd.concat([plot_df, extracted], ignore_index=True)
+        selected_codes = company_data.company_codes(selected_companies)
+        # Formula file plus this session's derived metrics; rebuilt below when one is added
+        formulas = load_formula_set().extend(st.session_state.get("custom_formulas", {}))
+        ma_summary_df = graph.get("summary", company_data, selected_companies, as_of_year)
     
-    if not plot_df.empty:
-        plot_df["Year"] = plot_df["Year"].astype(str)
-        plot_df["Value"] = pd.to_numeric(plot_df["Value"], errors="coerce")
-        plot_df.dropna(subset=["Value"], inplace=True)
+        if not ma_summary_df.empty:
+            # Display M&A Summary Table
+            st.subheader(f"M&A Valuation Summary ({as_of_year})")
+            st.dataframe(ma_summary_df, use_container_width=True)
+        
+            growth = graph.get("growth", company_data, growth_window, formulas, GROWTH_METRICS)
+            st.subheader(f"Growth Summary ({growth_window}-Year CAGR to {as_of_year})")
+            st.dataframe(growth.summary(selected_codes, as_of_year).round(2), use_container_width=True)
+        
+        # M&A Metric Analysis
+        profiling.section("3. Detailed M&A Metric Analysis")
+        st.header("3. Detailed M&A Metric Analysis")
+    
+        # Custom derived metrics live in this session only
+        custom_formulas = st.session_state.setdefault("custom_formulas", {})
+    
+        with st.expander("➕ Define a Derived Metric"):
+            col1, col2 = st.columns([1, 2])
+        
+            with col1:
+                new_metric_name = st.text_input("Metric Name:", placeholder="Net_Debt_Revenue")
+        
+            with col2:
+                new_metric_formula = st.text_input("Formula:", placeholder="(Total_Debt - Cash) / Revenue")
         
-        if chart_type == "Line Chart":
-            fig = px.line(
-                plot_df, 
-                x="Year", 
-                y="Value", 
-                color="Company",
-                facet_col="Industry",
-                markers=True,
-                title=f"{selected_metric} Trend Analysis by Industry"
+            st.caption("Use metric names with + - * / ** and abs() or log(); division by zero or a negative value gives no result.")
+        
+            if st.button("Add Metric") and new_metric_name and new_metric_formula:
+                try:
+                    load_formula_set().extend({**custom_formulas, new_metric_name: new_metric_formula})
+                except FormulaError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    custom_formulas[new_metric_name] = new_metric_formula
+                    st.success(f"✅ Added {new_metric_name} = {new_metric_formula}")
+    
+        formulas = load_formula_set().extend(custom_formulas)
+    
+        # Get available M&A metrics
+        ma_metrics = [
+            "EBITDA", "Revenue", "Enterprise_Value", "Market_Cap", 
+            "Net_Income", "Total_Assets", "Total_Debt", "Cash",
+            "EV_EBITDA_Multiple", "PE_Ratio", "Debt_EBITDA_Ratio", "ROE_Percent"
+        ]
+        # Derived metrics from the formula file and this session
+        ma_metrics += [m for m in formulas if m not in ma_metrics]
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            selected_metric = st.selectbox(
+                "Select M&A Metric for Trend Analysis:",
+                ma_metrics,
+                index=0  # Default to EBITDA
             )
-            fig.update_layout(height=500)
-            st.plotly_chart(fig, use_container_width=True)
-            
-        elif chart_type == "Bar Chart":
-            # Show latest year data
-            latest_data = plot_df[plot_df["Year"] == "2024"]
-            fig = px.bar(
-                latest_data,
-                x="Company",
-                y="Value",
-                color="Industry",
-                title=f"{selected_metric} - 2024 Comparison"
+    
+        with col2:
+            chart_type = st.selectbox(
+                "Chart Type:",
+                ["Line Chart", "Bar Chart", "Box Plot"],
+                index=0
             )
-            fig.update_xaxes(tickangle=45)
-            st.plotly_chart(fig, use_container_width=True)
-            
-        else:  # Box Plot
-            fig = px.box(
-                plot_df,
-                x="Industry",
-                y="Value",
-                color="Industry",
-                title=f"{selected_metric} Distribution by Industry (2020-2024)"
+    
+        # Create trend analysis
+        st.subheader(f"Trend Analysis: {selected_metric}")
+    
+        plot_df, pivot_df = graph.get("trend", company_data, selected_metric, selected_companies, formulas)
+    
+        if not plot_df.empty:
+            fig = graph.get(
+                "figure",
+                company_data,
+                selected_metric,
+                chart_type,
+                selected_companies,
+                as_of_year if chart_type == "Bar Chart" else None,
+                formulas
             )
-            st.plotly_chart(fig, use_container_width=True)
+            with profiling.stage("render trend chart"):
+                st.plotly_chart(fig, use_container_width=True)
+        
+            # Data table
+            st.subheader("Data Table")
+            st.dataframe(pivot_df, use_container_width=True)
         
-        # Data table
-        st.subheader("Data Table")
-        pivot_df = plot_df.pivot_table(index="Year", columns="Company", values="Value")
-        st.dataframe(pivot_df, use_container_width=True)
+            # Growth of the selected metric, ranked against each whole industry
+            trend_growth = graph.get("growth", company_data, growth_window, formulas, [selected_metric])
+            st.subheader(f"Growth Analytics: {selected_metric} ({as_of_year})")
+            st.dataframe(trend_growth.table(selected_metric, as_of_year, selected_codes).round(2), use_container_width=True)
 
-    # M&A Valuation Calculator
-    st.header("4. M&A Valuation Calculator")
+        # M&A Valuation Calculator
+        profiling.section("4. M&A Valuation Calculator")
+        st.header("4. M&A Valuation Calculator")
     
-    st.markdown("**Quick Valuation Based on Industry Multiples**")
+        st.markdown("**Quick Valuation Based on Industry Multiples**")
     
-    col1, col2, col3 = st.columns(3)
+        col1, col2, col3 = st.columns(3)
     
-    with col1:
-        target_industry = st.selectbox(
-            "Target Company Industry:",
-            ["Food", "Chemical", "Mobility"]
-        )
+        with col1:
+            target_industry = st.selectbox(
+                "Target Company Industry:",
+                company_data.industries
+            )
     
-    with col2:
-        target_ebitda = st.number_input(
-            "Target Company EBITDA (Trillion IDR):",
-            min_value=0.1,
-            max_value=100.0,
-            value=5.0,
-            step=0.1
+        with col2:
+            target_ebitda = st.number_input(
+                "Target Company EBITDA (Trillion IDR):",
+                min_value=0.1,
+                max_value=100.0,
+                value=5.0,
+                step=0.1
+            )
+    
+        with col3:
+            target_revenue = st.number_input(
+                "Target Company Revenue (Trillion IDR):",
+                min_value=0.5,
+                max_value=500.0,
+                value=25.0,
+                step=0.5
+            )
+    
+        peer_selection = st.radio(
+            "Comparable Selection:",
+            ["Industry Peers", "Nearest Neighbours"],
+            horizontal=True
         )
     
-    with col3:
-        target_revenue = st.number_input(
-            "Target Company Revenue (Trillion IDR):",
-            min_value=0.5,
-            max_value=500.0,
-            value=25.0,
-            step=0.5
+        if peer_selection == "Nearest Neighbours":
+            col1, col2, col3, col4 = st.columns(4)
+        
+            with col1:
+                n_peers = st.slider("Number of Peers:", 3, 25, 8)
+        
+            with col2:
+                target_leverage = st.number_input("Target Debt/EBITDA (optional):", min_value=0.0, value=None, step=0.1)
+        
+            with col3:
+                target_roe = st.number_input("Target ROE % (optional):", value=None, step=0.5)
+        
+            with col4:
+                same_industry_only = st.checkbox("Same industry only", value=False)
+    
+        valuation_mode = st.radio(
+            "Valuation Mode:",
+            ["Point Estimates", "Monte Carlo Simulation"],
+            horizontal=True
         )
     
-    if st.button("Calculate Valuation Range"):
-        # Get industry multiples
-        industry_companies = [comp for comp in selected_companies if target_industry in comp]
+        if valuation_mode == "Monte Carlo Simulation":
+            col1, col2, col3, col4 = st.columns(4)
         
-        if industry_companies:
-            industry_summary = calculate_ma_metrics(company_data, industry_companies)
+            with col1:
+                n_draws = st.selectbox(
+                    "Simulation Draws:",
+                    [100_000, 1_000_000],
+                    index=1,
+                    format_func=lambda n: f"{n:,}"
+                )
+        
+            with col2:
+                ebitda_uncertainty = st.slider("EBITDA Uncertainty (std. dev. %):", 0, 50, 10) / 100
+        
+            with col3:
+                revenue_uncertainty = st.slider("Revenue Uncertainty (std. dev. %):", 0, 50, 10) / 100
+        
+            with col4:
+                ebitda_weight = st.slider("Weight on EV/EBITDA vs EV/Revenue (%):", 0, 100, 50) / 100
+    
+        if st.button("Calculate Valuation Range"):
+            if peer_selection == "Nearest Neighbours":
+                # Most similar companies across the whole universe by size, margin, leverage and ROE
+                peer_codes, peer_distances = graph.get("peer_index", company_data, as_of_year).query(
+                    target_features(target_ebitda, target_revenue, debt_ebitda=target_leverage, roe=target_roe),
+                    k=n_peers,
+                    industry=target_industry if same_industry_only else None
+                )
+                industry_companies = [company_data.companies[c] for c in peer_codes[0]]
+                peers_title = f"{len(industry_companies)} Most Similar Comparable Companies"
+            else:
+                # Get industry multiples
+                industry_companies = [comp for comp in selected_companies if company_data.industry_of(comp) == target_industry]
+                peers_title = f"Comparable Companies in {target_industry} Industry"
+        
+            if industry_companies:
+                # Same comparables engine as the batch valuation CLI
+                valuation, industry_summary = graph.get(
+                    "valuation",
+                    company_data,
+                    industry_companies,
+                    target_ebitda,
+                    target_revenue,
+                    as_of_year,
+                    snapshot.aggregates
+                )
+                if peer_selection == "Nearest Neighbours":
+                    # Cached tables are shared, so add the distances to a copy
+                    industry_summary = industry_summary.assign(Similarity_Distance=peer_distances[0])
             
-            if not industry_summary.empty:
-                avg_ev_ebitda = industry_summary['EV_EBITDA_Multiple'].mean()
-                min_ev_ebitda = industry_summary['EV_EBITDA_Multiple'].min()
-                max_ev_ebitda = industry_summary['EV_EBITDA_Multiple'].max()
+                if not industry_summary.empty:
+                
+                    avg_ev_ebitda = valuation["ev_ebitda_mean"]
+                    min_ev_ebitda = valuation["ev_ebitda_min"]
+                    max_ev_ebitda = valuation["ev_ebitda_max"]
+                
+                    # Calculate valuation range
+                    low_valuation = valuation["conservative_valuation"]
+                    avg_valuation = valuation["average_valuation"]
+                    high_valuation = valuation["optimistic_valuation"]
                 
-                # Calculate valuation range
-                low_valuation = target_ebitda * min_ev_ebitda
-                avg_valuation = target_ebitda * avg_ev_ebitda
-                high_valuation = target_ebitda * max_ev_ebitda
+                    st.subheader("Valuation Results")
                 
-                st.subheader("Valuation Results")
+                    col1, col2, col3 = st.columns(3)
                 
-                col1, col2, col3 = st.columns(3)
+                    with col1:
+                        st.metric(
+                            "Conservative Valuation",
+                            f"{low_valuation:.1f} T IDR",
+                            f"{min_ev_ebitda:.1f}x EBITDA"
+                        )
                 
-                with col1:
-                    st.metric(
-                        "Conservative Valuation",
-                        f"{low_valuation:.1f} T IDR",
-                        f"{min_ev_ebitda:.1f}x EBITDA"
-                    )
+                    with col2:
+                        st.metric(
+                            "Average Valuation",
+                            f"{avg_valuation:.1f} T IDR",
+                            f"{avg_ev_ebitda:.1f}x EBITDA"
+                        )
                 
-                with col2:
-                    st.metric(
-                        "Average Valuation",
-                        f"{avg_valuation:.1f} T IDR",
-                        f"{avg_ev_ebitda:.1f}x EBITDA"
-                    )
+                    with col3:
+                        st.metric(
+                            "Optimistic Valuation",
+                            f"{high_valuation:.1f} T IDR",
+                            f"{max_ev_ebitda:.1f}x EBITDA"
+                        )
                 
-                with col3:
-                    st.metric(
-                        "Optimistic Valuation",
-                        f"{high_valuation:.1f} T IDR",
-                        f"{max_ev_ebitda:.1f}x EBITDA"
-                    )
+                    if valuation_mode == "Monte Carlo Simulation":
+                        # Resample multiples across every year of every comparable
+                        ebitda_multiples, revenue_multiples = comparable_multiples(
+                            company_data, company_data.company_codes(industry_companies)
+                        )
+                    
+                        if len(ebitda_multiples) > 0:
+                            simulation = simulate_valuation(
+                                ebitda_multiples,
+                                revenue_multiples,
+                                target_ebitda,
+                                target_revenue,
+                                n_draws=n_draws,
+                                ebitda_uncertainty=ebitda_uncertainty,
+                                revenue_uncertainty=revenue_uncertainty,
+                                ebitda_weight=ebitda_weight
+                            )
+                        
+                            st.subheader("Simulated Valuation Distribution")
+                        
+                            for col, (q, value) in zip(st.columns(len(simulation.percentiles)), simulation.percentiles.items()):
+                                with col:
+                                    st.metric(f"P{q} Valuation", f"{value:.1f} T IDR")
+                        
+                            with profiling.stage("render valuation histogram"):
+                                fig = valuation_histogram(simulation)
+                                st.plotly_chart(fig, use_container_width=True)
                 
-                # Show comparable companies
-                st.subheader(f"Comparable Companies in {target_industry} Industry")
-                st.dataframe(industry_summary, use_container_width=True)
+                    # Show comparable companies
+                    st.subheader(peers_title)
+                    st.dataframe(industry_summary, use_container_width=True)
 
 
-    # M&A Insights
-    st.header("5. M&A Insights")
-    
-    if not ma_summary_df.empty:
-        # Industry analysis
-        industry_stats = ma_summary_df.groupby('Industry').agg({
-            'EV_EBITDA_Multiple': ['mean', 'std'],
-            'Debt_EBITDA_Ratio': ['mean', 'std'],
-            'ROE_Percent': ['mean', 'std'],
-            'EBITDA_2024': 'sum'
-        }).round(2)
+        # M&A Insights
+        profiling.section("5. M&A Insights")
+        st.header("5. M&A Insights")
+    
+        # Industry analysis from the running aggregates, no rescan of the selection
+        industry_stats, benchmarks, quartiles = graph.get("insights", snapshot.aggregates, selected_companies, as_of_year)
+    
+        if not ma_summary_df.empty:
+            st.subheader("Industry Analysis Summary")
+            st.dataframe(industry_stats, use_container_width=True)
+    
+        if not benchmarks.empty:
+            st.subheader(f"Industry Benchmarks - All Companies ({company_data.years[-1]})")
+            st.dataframe(benchmarks, use_container_width=True)
         
-        st.subheader("Industry Analysis Summary")
-        st.dataframe(industry_stats, use_container_width=True)
+            st.subheader("EV/EBITDA Distribution by Industry - All Companies")
+            st.dataframe(quartiles.round(2), use_container_width=True)
+    
+        # Merger Pro-Forma Screen
+        profiling.section("6. Merger Pro-Forma Screen")
+        st.header("6. Merger Pro-Forma Screen")
+    
+        col1, col2, col3, col4 = st.columns(4)
+    
+        with col1:
+            deal_premium = st.slider("Acquisition Premium (%):", 0, 100, 30) / 100
+    
+        with col2:
+            consideration = st.radio("Consideration:", ["Stock", "Cash"], horizontal=True)
+    
+        with col3:
+            max_leverage = st.number_input(
+                "Max Pro-Forma Debt/EBITDA:",
+                min_value=0.0,
+                value=4.0,
+                step=0.5
+            )
+    
+        with col4:
+            top_pairs = st.selectbox("Top Pairs:", [25, 50, 100, 250], index=2)
+    
+        col1, col2 = st.columns(2)
+    
+        with col1:
+            # Accretion divides by acquirer earnings, so near-breakeven acquirers would top the ranking
+            min_earnings_yield = st.number_input(
+                "Min. Acquirer Earnings Yield (%):",
+                min_value=0.0,
+                value=MIN_EARNINGS_YIELD * 100,
+                step=0.5
+            ) / 100
+    
+        with col2:
+            selected_only = st.checkbox("Selected companies only", value=False)
+    
+        if st.button("Run Pro-Forma Screen"):
+            # Every acquirer/target pair in the as-of year, ranked by EPS accretion
+            pairs_df = screen_pairs(
+                company_data,
+                companies=selected_companies if selected_only else None,
+                as_of_year=as_of_year,
+                premium=deal_premium,
+                consideration=consideration.lower(),
+                max_leverage=max_leverage,
+                min_earnings_yield=min_earnings_yield,
+                top_n=top_pairs
+            )
         
+            if pairs_df.empty:
+                st.warning("No pairs meet the leverage limit and acquirer earnings floor")
+            else:
+                st.subheader(f"Top {len(pairs_df)} Accretive Combinations")
+                st.dataframe(pairs_df.round(2), use_container_width=True)
+    
+        # Export
+        profiling.section("7. Export Data")
+        st.header("7. Export Data")
+    
+        export_format = st.radio("Export Format:", ["CSV", "XLSX"], horizontal=True).lower()
+        st.caption("Files are built when you click, not on every rerun; the finished file is held in memory while it downloads.")
+    
+        col1, col2, col3 = st.columns(3)
+    
+        with col1:
+            st.download_button(
+                "Download M&A Summary",
+                lambda: spool_export(frame_rows(ma_summary_df, index=False), export_format),
+                file_name=f"ma_summary_{as_of_year}.{export_format}",
+                mime=MIME_TYPES[export_format]
+            )
+    
+        with col2:
+            st.download_button(
+                f"Download {selected_metric} Trend Table",
+                lambda: spool_export(frame_rows(pivot_df), export_format),
+                file_name=f"trend_{selected_metric}.{export_format}",
+                mime=MIME_TYPES[export_format]
+            )
+    
+        with col3:
+            full_panel_cells = panel_cells(company_data, formulas=formulas)
+            if full_panel_cells <= MAX_DOWNLOAD_CELLS:
+                st.download_button(
+                    "Download Full Panel",
+                    lambda: spool_export(panel_rows(company_data, formulas=formulas), export_format),
+                    file_name=f"ma_panel.{export_format}",
+                    mime=MIME_TYPES[export_format]
+                )
+            else:
+                # Downloads are held in server memory whole, so large panels go through the CLI
+                st.button("Download Full Panel", disabled=True)
+                st.caption(f"The full panel ({full_panel_cells:,} values) is too large to download here; "
+                           f"run `python -m dorenth export panel -o ma_panel.{export_format}` instead.")
+finally:
+    if profiler is not None:
+        profiler.finish()
+        if sampler is not None:
+            st.session_state["profile_sampler"] = sampler.stop()
+
+
+# Diagnostics, shown only while profiling
+if profiler is not None:
+    profiler.log(
+        os.environ.get("MA_PROFILE_LOG"),
+        companies=len(company_data),
+        selected=len(selected_companies),
+        dataset_version=snapshot.version
+    )
+    
+    with st.expander("🩺 Diagnostics"):
+        st.caption(f"This rerun took {profiler.seconds * 1000:.0f} ms; stage figures include their nested stages.")
+        st.dataframe(pd.DataFrame(profiler.report()).round(2), use_container_width=True)
+        
+        st.markdown("**Computation Graph Cache**")
+        st.dataframe(pd.DataFrame(graph.stats()).round(3), use_container_width=True)
         
+        if st.button("Sample Next Rerun"):
+            st.session_state["profile_sample_next"] = True
+            st.rerun()
+        
+        last_sampler = st.session_state.get("profile_sampler")
+        if last_sampler is not None:
+            st.markdown(f"**Sampling Profile ({last_sampler.samples} samples every {last_sampler.interval * 1000:.0f} ms)**")
+            st.dataframe(pd.DataFrame(last_sampler.top_functions()).round(1), use_container_width=True)
+            st.download_button(
+                "Download Collapsed Stacks",
+                last_sampler.collapsed(),
+                file_name="rerun_profile.folded",
+                mime="text/plain"
+            )
+
 # Footer
 st.markdown("---")
 st.markdown("© 2025 Dorenth | Made using Python 🐍")
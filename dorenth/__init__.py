@@ -0,0 +1 @@
+"""Computation core for the Dorenth M&A decision support tool"""
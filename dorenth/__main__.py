@@ -0,0 +1,5 @@
+import sys
+
+from dorenth.cli import main
+
+sys.exit(main())
@@ -0,0 +1,271 @@
+"""
+Industry aggregate store: mergeable running statistics per industry, metric and year.
+Each industry keeps count, sum, sum of squares, min, max and a relative-error quantile
+sketch of its members' values. Adding a company merges its values in and removing or
+editing one subtracts the old values back out, so a reload only touches the industries
+whose workbooks changed. A query for a subset reuses an industry's statistics when the
+subset covers the whole industry and reduces just the selected rows otherwise.
+"""
+import math
+import uuid
+from collections import namedtuple
+
+import numpy as np
+
+# Metrics aggregated for the insights and valuation sections
+AGGREGATE_METRICS = [
+    "EV_EBITDA_Multiple",
+    "EV_Revenue_Multiple",
+    "Debt_EBITDA_Ratio",
+    "ROE_Percent",
+    "EBITDA"
+]
+
+# Quantile sketch: log-spaced buckets, each within SKETCH_ALPHA relative error, for
+# magnitudes SKETCH_MIN..SKETCH_MAX; smaller magnitudes count as zero, larger ones clamp
+SKETCH_ALPHA = 0.05
+SKETCH_MIN, SKETCH_MAX = 1e-3, 1e6
+
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_LOG_GAMMA = math.log(_GAMMA)
+_LOW = math.ceil(math.log(SKETCH_MIN) / _LOG_GAMMA)
+_SIDE = math.ceil(math.log(SKETCH_MAX) / _LOG_GAMMA) - _LOW + 1
+# Negative buckets (largest magnitude first), one zero bucket, then positive buckets
+SKETCH_BUCKETS = 2 * _SIDE + 1
+_MAGNITUDES = 2 * _GAMMA ** np.arange(_LOW, _LOW + _SIDE) / (_GAMMA + 1)
+_BUCKET_VALUES = np.concatenate([-_MAGNITUDES[::-1], [0.0], _MAGNITUDES])
+
+
+def sketch_buckets(values):
+    """Sketch bucket of each value; NaN maps to -1"""
+    values = np.asarray(values, dtype=np.float64)
+    magnitude = np.abs(np.where(np.isnan(values), SKETCH_MIN, values))
+    k = np.ceil(np.log(np.clip(magnitude, SKETCH_MIN, SKETCH_MAX)) / _LOG_GAMMA).astype(np.intp) - _LOW
+    buckets = np.where(values > 0, _SIDE + 1 + k, _SIDE - 1 - k)
+    buckets[magnitude < SKETCH_MIN] = _SIDE
+    buckets[np.isnan(values)] = -1
+    return buckets
+
+
+class RunningStats(namedtuple("RunningStats", ["count", "total", "total_sq", "minimum", "maximum", "buckets"])):
+    """
+    Mergeable statistics of a set of values, elementwise over the cell shape of the
+    arrays (buckets has one more axis for the sketch). NaN values are not counted.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def of(cls, values):
+        """Statistics over axis 0 of values, one per remaining cell"""
+        values = np.asarray(values, dtype=np.float64)
+        cells = values.shape[1:]
+        valid = ~np.isnan(values)
+        filled = np.where(valid, values, 0.0)
+        if len(values):
+            minimum = np.fmin.reduce(values, axis=0)
+            maximum = np.fmax.reduce(values, axis=0)
+        else:
+            minimum = np.full(cells, np.nan)
+            maximum = np.full(cells, np.nan)
+
+        # One bincount over (cell, bucket) pairs fills every cell's sketch
+        n_cells = math.prod(cells)
+        flat = sketch_buckets(values).reshape(len(values), n_cells)
+        cell = np.broadcast_to(np.arange(n_cells), flat.shape)
+        keep = flat >= 0
+        buckets = np.bincount(cell[keep] * SKETCH_BUCKETS + flat[keep], minlength=n_cells * SKETCH_BUCKETS)
+
+        return cls(
+            valid.sum(axis=0),
+            filled.sum(axis=0),
+            (filled * filled).sum(axis=0),
+            minimum,
+            maximum,
+            buckets.reshape(cells + (SKETCH_BUCKETS,))
+        )
+
+    def merge(self, other):
+        """Statistics of the union of two disjoint sets"""
+        return RunningStats(
+            self.count + other.count,
+            self.total + other.total,
+            self.total_sq + other.total_sq,
+            np.fmin(self.minimum, other.minimum),
+            np.fmax(self.maximum, other.maximum),
+            self.buckets + other.buckets
+        )
+
+    def subtract(self, other, minimum, maximum):
+        """
+        Statistics after removing a subset; min and max cannot be subtracted,
+        so the caller passes them in for the remaining set
+        """
+        count = self.count - other.count
+        empty = count == 0
+        # Reset emptied cells so rounding left over from the sums does not linger
+        return RunningStats(
+            count,
+            np.where(empty, 0.0, self.total - other.total),
+            np.where(empty, 0.0, self.total_sq - other.total_sq),
+            minimum,
+            maximum,
+            self.buckets - other.buckets
+        )
+
+    def at(self, index):
+        """Statistics of the cells at index of the leading cell axes (e.g. one year)"""
+        return RunningStats(*(a[index] for a in self))
+
+    @property
+    def mean(self):
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.count > 0, self.total / self.count, np.nan)
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1), NaN below two values"""
+        with np.errstate(divide="ignore", invalid="ignore"):
+            var = (self.total_sq - self.total * self.total / self.count) / (self.count - 1)
+        return np.where(self.count > 1, np.sqrt(np.maximum(var, 0.0)), np.nan)
+
+    def quantile(self, q):
+        """Approximate q-quantile per cell from the sketch, kept within the exact min and max"""
+        cumulative = np.cumsum(self.buckets, axis=-1)
+        rank = q * (self.count - 1)
+        position = np.argmax(cumulative > rank[..., None], axis=-1)
+        value = np.clip(_BUCKET_VALUES[position], self.minimum, self.maximum)
+        return np.where(self.count > 0, value, np.nan)
+
+
+# One industry's members, their (companies, metrics, years) values and statistics
+IndustryGroup = namedtuple("IndustryGroup", ["companies", "index", "values", "stats"])
+
+
+def _group(companies, values):
+    companies = list(companies)
+    return IndustryGroup(companies, {c: i for i, c in enumerate(companies)}, values, RunningStats.of(values))
+
+
+class AggregateStore:
+    """
+    Running statistics of metrics (AGGREGATE_METRICS by default, reported or derived)
+    for every industry and year of a panel. A store is never modified: update() returns
+    a new one sharing every industry the change did not touch.
+    """
+
+    def __init__(self, panel, metrics=None):
+        self.metrics = list(AGGREGATE_METRICS if metrics is None else metrics)
+        self.metric_index = {m: i for i, m in enumerate(self.metrics)}
+        self.years = [int(y) for y in panel.years]
+        self.year_index = {y: i for i, y in enumerate(self.years)}
+
+        values = self._values(panel, np.arange(len(panel)))
+        order = np.argsort(panel.company_industry, kind="stable")
+        bounds = np.searchsorted(panel.company_industry[order], np.arange(len(panel.industries) + 1))
+        self.groups = {}
+        for g, industry in enumerate(panel.industries):
+            rows = order[bounds[g]:bounds[g + 1]]
+            if len(rows):
+                self.groups[industry] = _group((panel.companies[r] for r in rows), values[rows])
+        self.company_industry = {c: ind for ind, group in self.groups.items() for c in group.companies}
+        # Identity of this immutable store, used as a cache key
+        self.token = uuid.uuid4().hex
+
+    def _values(self, panel, codes):
+        shape = (len(codes), len(self.metrics), len(self.years))
+        if not self.metrics:
+            return np.empty(shape)
+        return np.stack([panel.block(m)[codes] for m in self.metrics], axis=1)
+
+    def update(self, panel, companies):
+        """
+        Store for a new version of panel in which only the given company keys were
+        added, edited or removed. Falls back to a full rebuild when the year axis changed.
+        """
+        if [int(y) for y in panel.years] != self.years:
+            return AggregateStore(panel, self.metrics)
+
+        store = object.__new__(AggregateStore)
+        store.metrics, store.metric_index = self.metrics, self.metric_index
+        store.years, store.year_index = self.years, self.year_index
+        store.groups = dict(self.groups)
+        store.company_industry = dict(self.company_industry)
+        store.token = uuid.uuid4().hex
+
+        # Per industry: keys to take out and (key, row) pairs to put back in
+        removals, additions = {}, {}
+        for company in dict.fromkeys(companies):
+            old = store.company_industry.pop(company, None)
+            if old is not None:
+                removals.setdefault(old, []).append(company)
+            if company in panel.company_index:
+                new = panel.industry_of(company)
+                additions.setdefault(new, []).append(company)
+                store.company_industry[company] = new
+
+        for industry in set(removals) | set(additions):
+            store._update_group(panel, industry, removals.get(industry, []), additions.get(industry, []))
+        return store
+
+    def _update_group(self, panel, industry, removed, added):
+        group = self.groups.get(industry)
+        stats = None if group is None else group.stats
+        companies, values = ([], np.empty((0, len(self.metrics), len(self.years)))) if group is None else (group.companies, group.values)
+
+        if removed:
+            rows = np.array([group.index[c] for c in removed], dtype=np.intp)
+            keep = np.ones(len(companies), dtype=bool)
+            keep[rows] = False
+            old = values[rows]
+            companies = [c for c, k in zip(companies, keep) if k]
+            values = values[keep]
+            # Min and max only need a rescan where a removed value was the extreme
+            if np.any(old == stats.minimum) or np.any(old == stats.maximum):
+                remaining = RunningStats.of(values)
+                minimum, maximum = remaining.minimum, remaining.maximum
+            else:
+                minimum, maximum = stats.minimum, stats.maximum
+            stats = stats.subtract(RunningStats.of(old), minimum, maximum)
+
+        if added:
+            new = self._values(panel, panel.company_codes(added))
+            companies = companies + list(added)
+            values = np.concatenate([values, new])
+            stats = RunningStats.of(new) if stats is None else stats.merge(RunningStats.of(new))
+
+        if companies:
+            self.groups[industry] = IndustryGroup(companies, {c: i for i, c in enumerate(companies)}, values, stats)
+        else:
+            self.groups.pop(industry, None)
+
+    def stats(self, companies=None, year=None):
+        """
+        {industry: RunningStats over metrics} in one year (latest by default) for the given
+        company keys (all when None), industries in sorted order; unknown keys are skipped
+        """
+        y = self.year_index[int(year)] if year is not None else len(self.years) - 1
+        if companies is None:
+            return {ind: self.groups[ind].stats.at((slice(None), y)) for ind in sorted(self.groups)}
+
+        selected = {}
+        for company in companies:
+            industry = self.company_industry.get(company)
+            if industry is not None:
+                selected.setdefault(industry, set()).add(company)
+
+        out = {}
+        for industry in sorted(selected):
+            group = self.groups[industry]
+            if len(selected[industry]) == len(group.companies):
+                out[industry] = group.stats.at((slice(None), y))
+            else:
+                rows = np.fromiter((group.index[c] for c in selected[industry]), dtype=np.intp)
+                out[industry] = RunningStats.of(group.values[rows, :, y])
+        return out
+
+    def pooled(self, companies=None, year=None):
+        """RunningStats over metrics of all the given companies together, merged across industries"""
+        pooled = None
+        for stats in self.stats(companies, year).values():
+            pooled = stats if pooled is None else pooled.merge(stats)
+        return pooled
@@ -0,0 +1,131 @@
+"""
+Benchmarks of the analysis pipeline on synthetic universes of increasing size.
+Each case is timed over several runs (best and median wall time) and run once more
+under tracemalloc for its peak allocation. Results are returned as plain dicts, with
+the environment they were measured in, ready to be written as JSON and compared
+between commits.
+"""
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from dorenth.aggregates import AggregateStore
+from dorenth.metrics import (build_trend_dataset, calculate_ma_metrics, extract_metric, industry_summary,
+                             summarize_industries)
+from dorenth.synthetic import synthetic_panel
+from dorenth.valuation import comparable_multiples, simulate_valuation, value_against_peers, value_targets
+
+# Universe sizes (companies) benchmarked by default
+DEFAULT_SIZES = (100, 1_000, 10_000)
+
+# Companies in the selection for per-selection stages, as in the app's company list
+SELECTION_SIZE = 500
+
+# Targets valued at once by the batch valuation case
+BATCH_TARGETS = 1_000
+
+# Draws of the Monte Carlo valuation case
+SIMULATION_DRAWS = 100_000
+
+
+def measure(func, repeat=5):
+    """Best and median wall time of repeat calls, then the peak traced allocation of one more"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"best_seconds": min(times), "median_seconds": statistics.median(times), "peak_bytes": peak}
+
+
+def benchmark_cases(panel, seed=0):
+    """{name: zero-argument callable} of each pipeline stage on panel"""
+    from dorenth.charts import trend_figure
+
+    year = int(panel.years[-1])
+    step = max(1, len(panel) // SELECTION_SIZE)
+    selection = panel.companies[::step][:SELECTION_SIZE]
+    aggregates = AggregateStore(panel)
+
+    # Valuation peers: the selection's members of the first industry
+    industry = panel.industries[0]
+    peers = [c for c in selection if panel.industry_of(c) == industry]
+    peer_codes = panel.company_codes(peers)
+    rng = np.random.default_rng(seed)
+    targets = pd.DataFrame({
+        "industry": rng.choice(panel.industries, BATCH_TARGETS),
+        "ebitda": rng.uniform(0.5, 50.0, BATCH_TARGETS),
+        "revenue": rng.uniform(2.0, 250.0, BATCH_TARGETS)
+    })
+    plot_df, _ = build_trend_dataset(panel, "EBITDA", selection)
+    year_range = (panel.years[0], panel.years[-1])
+
+    return {
+        "extract_metric": lambda: [extract_metric(panel, c, "EBITDA") for c in selection],
+        "calculate_ma_metrics": lambda: calculate_ma_metrics(panel, None, year),
+        "trend_dataset": lambda: build_trend_dataset(panel, "EBITDA", selection),
+        "trend_figure": lambda: trend_figure(plot_df, "Line Chart", "EBITDA", None, year_range),
+        "insights_groupby": lambda: summarize_industries(calculate_ma_metrics(panel, selection, year), year),
+        "insights_aggregates": lambda: industry_summary(aggregates, selection, year),
+        "aggregate_store": lambda: AggregateStore(panel),
+        "valuation": lambda: value_against_peers(panel, peers, 5.0, 25.0, year, aggregates=aggregates),
+        "valuation_batch": lambda: value_targets(panel, targets, as_of_year=year, aggregates=aggregates),
+        "valuation_simulation": lambda: simulate_valuation(
+            *comparable_multiples(panel, peer_codes), 5.0, 25.0, n_draws=SIMULATION_DRAWS, seed=seed
+        )
+    }
+
+
+def environment():
+    """Versions and machine the results were measured on"""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "processor": platform.processor() or platform.machine()
+    }
+
+
+def run_benchmarks(sizes=DEFAULT_SIZES, n_metrics=12, n_years=5, n_industries=3, repeat=5, seed=0,
+                   cases=None, progress=None):
+    """
+    Benchmark every case (all by default) on a synthetic universe of each size.
+    progress, when given, is called with each result as it is measured.
+    """
+    results = []
+    for n_companies in sizes:
+        panel = synthetic_panel(n_companies, n_metrics, n_years, n_industries, seed=seed)
+        for name, func in benchmark_cases(panel, seed).items():
+            if cases is not None and name not in cases:
+                continue
+            result = {
+                "case": name,
+                "companies": n_companies,
+                "metrics": n_metrics,
+                "years": n_years,
+                "industries": n_industries,
+                "repeat": repeat,
+                **measure(func, repeat)
+            }
+            if progress is not None:
+                progress(result)
+            results.append(result)
+
+    return {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "seed": seed,
+        "environment": environment(),
+        "results": results
+    }
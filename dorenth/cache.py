@@ -0,0 +1,109 @@
+"""
+On-disk cache of parsed workbooks, keyed by the hash of each file's content.
+Each data directory keeps its entries in its own subfolder, so one cache directory can
+serve several data directories without one pruning the other's entries.
+Entries are Arrow IPC files (a metric column plus one float64 column per year)
+that are memory-mapped on load, so unchanged workbooks never go back through openpyxl.
+pyarrow is imported on first use so parse workers that only hash files do not load it.
+"""
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+# Bump whenever parse_workbook output changes so stale entries are not reused
+PARSER_VERSION = 1
+
+CACHE_SUFFIX = ".arrow"
+
+
+def file_key(path, sheet_name="Sheet1"):
+    """Content hash of a workbook, salted with the parser version and sheet"""
+    with open(path, "rb") as f:
+        digest = hashlib.file_digest(f, lambda: hashlib.blake2b(digest_size=20))
+    digest.update(f"{PARSER_VERSION}:{sheet_name}".encode())
+    return digest.hexdigest()
+
+
+def directory_scope(data_dir):
+    """Name of the cache subfolder for a data directory: its name plus a hash of its real path"""
+    path = os.path.realpath(data_dir)
+    digest = hashlib.blake2b(path.encode(), digest_size=8).hexdigest()
+    return f"{os.path.basename(path) or 'root'}-{digest}"
+
+
+class WorkbookCache:
+    """Directory of parsed workbooks addressed by file_key"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def __contains__(self, key):
+        return os.path.exists(self._path(key))
+
+    def load(self, key):
+        """(metrics, years, values) for a cached workbook, or None on a miss"""
+        import pyarrow as pa
+
+        try:
+            source = pa.memory_map(self._path(key), "r")
+        except FileNotFoundError:
+            return None
+        try:
+            table = pa.ipc.open_file(source).read_all()
+            years = json.loads(table.schema.metadata[b"years"])
+            metrics = table.column("metric").to_pylist()
+            # Each year column is a zero-copy view of the mapped file until stacked
+            columns = [table.column(str(y)).chunk(0).to_numpy(zero_copy_only=True) for y in years]
+            values = np.column_stack(columns) if columns else np.empty((len(metrics), 0))
+        except (pa.ArrowInvalid, KeyError, ValueError):
+            # Truncated or foreign file: treat as a miss and let it be re-parsed
+            return None
+        finally:
+            source.close()
+        return metrics, years, values
+
+    def store(self, key, parsed):
+        """Write a parsed workbook atomically so readers never see a partial entry"""
+        import pyarrow as pa
+
+        metrics, years, values = parsed
+        values = np.asarray(values, dtype=np.float64)
+        arrays = [pa.array(metrics, type=pa.string())]
+        arrays += [pa.array(values[:, i], type=pa.float64()) for i in range(len(years))]
+        schema = pa.schema(
+            [("metric", pa.string())] + [(str(y), pa.float64()) for y in years],
+            metadata={"years": json.dumps([int(y) for y in years])}
+        )
+        table = pa.Table.from_arrays(arrays, schema=schema)
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as sink, pa.ipc.new_file(sink, schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, self._path(key))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def discard(self, key):
+        try:
+            os.unlink(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, keep):
+        """Delete entries whose key is not in keep; returns how many were removed"""
+        removed = 0
+        for filename in os.listdir(self.directory):
+            key, suffix = os.path.splitext(filename)
+            if suffix == CACHE_SUFFIX and key not in keep:
+                self.discard(key)
+                removed += 1
+        return removed
@@ -0,0 +1,171 @@
+"""
+Plotly figures for the app.
+plotly is imported inside each builder so only code that draws a chart pays for it.
+Trend charts keep their payload bounded: large selections switch to WebGL traces and
+then to percentile bands, bar charts show the largest values only, and box plots are
+drawn from precomputed quartiles rather than raw points.
+"""
+import numpy as np
+
+# Above this many companies line charts use one WebGL trace per industry
+WEBGL_COMPANIES = 40
+# Above this many companies lines give way to per-industry percentile bands
+MAX_LINE_COMPANIES = 400
+# Bar charts show at most this many companies, largest values first
+MAX_BARS = 100
+
+
+def _industry_subplots(industries, title):
+    """One column per industry with a shared y axis, titled like a plotly express facet"""
+    from plotly.subplots import make_subplots
+
+    fig = make_subplots(
+        rows=1,
+        cols=max(len(industries), 1),
+        shared_yaxes=True,
+        horizontal_spacing=0.03,
+        subplot_titles=[f"Industry={ind}" for ind in industries]
+    )
+    fig.update_layout(title=title, height=500)
+    return fig
+
+
+def _webgl_lines(plot_df, metric):
+    """Every company as a line, but one scattergl trace per industry with gaps between companies"""
+    import plotly.graph_objects as go
+
+    industries = sorted(plot_df["Industry"].unique())
+    fig = _industry_subplots(industries, f"{metric} Trend Analysis by Industry")
+    data = plot_df.sort_values(["Industry", "Company", "Year"], kind="stable")
+
+    for col, (industry, group) in enumerate(data.groupby("Industry", sort=True), start=1):
+        # A NaN after each company's last point breaks the line before the next one
+        breaks = np.flatnonzero(group["Company"].to_numpy()[1:] != group["Company"].to_numpy()[:-1]) + 1
+        x = np.insert(group["Year"].to_numpy(dtype=np.float64), breaks, np.nan)
+        y = np.insert(group["Value"].to_numpy(dtype=np.float64), breaks, np.nan)
+        text = np.insert(group["Company"].to_numpy(dtype=object), breaks, "")
+        fig.add_trace(go.Scattergl(
+            x=x,
+            y=y,
+            text=text,
+            mode="lines",
+            name=industry,
+            hovertemplate="%{text}<br>%{x}: %{y}<extra></extra>"
+        ), row=1, col=col)
+    return fig
+
+
+def _percentile_bands(plot_df, metric):
+    """P10-P90 band and median per industry and year, whatever the number of companies"""
+    import plotly.graph_objects as go
+
+    industries = sorted(plot_df["Industry"].unique())
+    fig = _industry_subplots(industries, f"{metric} Trend Analysis by Industry (P10-P90 band and median)")
+    bands = plot_df.groupby(["Industry", "Year"])["Value"].quantile([0.1, 0.5, 0.9]).unstack()
+
+    for col, industry in enumerate(industries, start=1):
+        band = bands.loc[industry]
+        years = band.index.astype(int)
+        fig.add_trace(go.Scatter(x=years, y=band[0.9], mode="lines", line_width=0, showlegend=False,
+                                 name=f"{industry} P90"), row=1, col=col)
+        fig.add_trace(go.Scatter(x=years, y=band[0.1], mode="lines", line_width=0, fill="tonexty",
+                                 name=f"{industry} P10-P90"), row=1, col=col)
+        fig.add_trace(go.Scatter(x=years, y=band[0.5], mode="lines+markers", name=f"{industry} median"),
+                      row=1, col=col)
+    return fig
+
+
+def _quartile_boxes(plot_df, metric, year_range):
+    """
+    One box per industry from quartiles computed here, so only five numbers per
+    industry reach the browser; whiskers stop at the furthest values within 1.5 IQR
+    """
+    import plotly.graph_objects as go
+
+    values = plot_df.groupby("Industry")["Value"]
+    quartiles = values.quantile([0.25, 0.5, 0.75]).unstack()
+    iqr = quartiles[0.75] - quartiles[0.25]
+    low = plot_df["Industry"].map(quartiles[0.25] - 1.5 * iqr)
+    high = plot_df["Industry"].map(quartiles[0.75] + 1.5 * iqr)
+    inside = plot_df["Value"].between(low, high).to_numpy()
+    fences = plot_df[inside].groupby("Industry")["Value"].agg(["min", "max"])
+
+    fig = go.Figure()
+    for industry, row in quartiles.iterrows():
+        fig.add_trace(go.Box(
+            x=[industry],
+            q1=[row[0.25]],
+            median=[row[0.5]],
+            q3=[row[0.75]],
+            lowerfence=[fences.loc[industry, "min"]],
+            upperfence=[fences.loc[industry, "max"]],
+            name=industry
+        ))
+    fig.update_layout(
+        title=f"{metric} Distribution by Industry ({year_range[0]}-{year_range[1]})",
+        xaxis_title="Industry",
+        yaxis_title="Value",
+        legend_title_text="Industry"
+    )
+    return fig
+
+
+def trend_figure(plot_df, chart_type, metric, as_of_year, year_range):
+    """Line, bar (as-of year) or box chart of a long-format trend dataset"""
+    import plotly.express as px
+
+    if chart_type == "Line Chart":
+        n_companies = plot_df["Company"].nunique()
+        if n_companies > MAX_LINE_COMPANIES:
+            return _percentile_bands(plot_df, metric)
+        if n_companies > WEBGL_COMPANIES:
+            return _webgl_lines(plot_df, metric)
+
+        fig = px.line(
+            plot_df,
+            x="Year",
+            y="Value",
+            color="Company",
+            facet_col="Industry",
+            markers=True,
+            title=f"{metric} Trend Analysis by Industry"
+        )
+        fig.update_layout(height=500)
+
+    elif chart_type == "Bar Chart":
+        # Show as-of year data
+        latest_data = plot_df[plot_df["Year"] == str(as_of_year)]
+        title = f"{metric} - {as_of_year} Comparison"
+        if len(latest_data) > MAX_BARS:
+            title += f" (top {MAX_BARS} of {len(latest_data)})"
+            latest_data = latest_data.nlargest(MAX_BARS, "Value")
+        fig = px.bar(
+            latest_data,
+            x="Company",
+            y="Value",
+            color="Industry",
+            title=title
+        )
+        fig.update_xaxes(tickangle=45)
+
+    else:  # Box Plot
+        fig = _quartile_boxes(plot_df, metric, year_range)
+
+    return fig
+
+
+def valuation_histogram(simulation):
+    """Pre-binned histogram of simulated enterprise value with P5/P50/P95 markers"""
+    import plotly.express as px
+
+    centers = (simulation.hist_edges[:-1] + simulation.hist_edges[1:]) / 2
+    fig = px.bar(
+        x=centers,
+        y=simulation.hist_counts,
+        labels={"x": "Implied Enterprise Value (T IDR)", "y": "Draws"},
+        title=f"Implied EV over {simulation.n_draws:,} draws from {simulation.n_comparables} comparable peer-years"
+    )
+    fig.update_layout(bargap=0)
+    for q in (5, 50, 95):
+        fig.add_vline(x=simulation.percentiles[q], line_dash="dash", annotation_text=f"P{q}")
+    return fig
@@ -0,0 +1,175 @@
+"""Command-line entry point: python -m dorenth <command> ..."""
+import argparse
+import sys
+
+
+def load_panel(args):
+    """Panel for a command from --data-dir (embedded data when absent), reporting workbooks that failed to load"""
+    from dorenth.data import open_data_source
+
+    snapshot = open_data_source(args.data_dir, args.cache_dir).snapshot()
+    for error in snapshot.errors:
+        print(f"warning: {error.path}: {error.error}", file=sys.stderr)
+    return snapshot.panel
+
+
+def check_year(panel, year):
+    """Whether year (None for the latest) is in the panel, reporting the available years when not"""
+    if year is None or year in panel.years:
+        return True
+    print(f"error: no data for {year}; available years: {', '.join(str(y) for y in panel.years)}",
+          file=sys.stderr)
+    return False
+
+
+def cmd_value(args):
+    import pandas as pd
+
+    from dorenth.valuation import unmatched_industries, value_targets
+
+    panel = load_panel(args)
+    if not check_year(panel, args.as_of_year):
+        return 2
+    targets = pd.read_csv(args.targets)
+    result = value_targets(panel, targets, as_of_year=args.as_of_year)
+    unmatched = unmatched_industries(panel, result["industry"])
+    if unmatched:
+        rows = int(result["industry"].isin(unmatched).sum())
+        print(f"warning: {rows} target(s) left unvalued, unknown industries: {', '.join(unmatched)}",
+              file=sys.stderr)
+    result.to_csv(args.output or sys.stdout, index=False)
+    return 0
+
+
+def cmd_export(args):
+    import os
+
+    from dorenth.export import EXPORT_FORMATS, frame_rows, panel_rows, write_export
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.output or "")[1].lstrip(".").lower()
+        fmt = extension if extension in EXPORT_FORMATS else "csv"
+    if fmt == "xlsx" and not args.output:
+        print("error: xlsx export needs -o/--output", file=sys.stderr)
+        return 2
+
+    panel = load_panel(args)
+    if not check_year(panel, args.as_of_year):
+        return 2
+    if args.table == "panel":
+        rows = panel_rows(panel, metrics=args.metrics)
+    else:
+        from dorenth.metrics import calculate_ma_metrics
+
+        rows = frame_rows(calculate_ma_metrics(panel, as_of_year=args.as_of_year), index=False)
+
+    if args.output:
+        with open(args.output, "wb") as f:
+            write_export(rows, f, fmt)
+    else:
+        write_export(rows, sys.stdout.buffer, fmt)
+    return 0
+
+
+def cmd_bench(args):
+    import json
+
+    from dorenth.bench import run_benchmarks
+
+    def progress(result):
+        print(f"{result['case']:<22} {result['companies']:>9,} companies  "
+              f"best {result['best_seconds'] * 1000:9.2f} ms  peak {result['peak_bytes'] / 2**20:8.2f} MiB",
+              file=sys.stderr)
+
+    report = run_benchmarks(
+        sizes=args.sizes,
+        n_metrics=args.metrics,
+        n_years=args.years,
+        n_industries=args.industries,
+        repeat=args.repeat,
+        seed=args.seed,
+        cases=args.cases,
+        progress=progress
+    )
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    return 0
+
+
+def cmd_synthetic(args):
+    from dorenth.synthetic import write_workbooks
+
+    paths = write_workbooks(
+        args.directory,
+        args.companies,
+        n_metrics=args.metrics,
+        n_years=args.years,
+        n_industries=args.industries,
+        seed=args.seed,
+        start_year=args.start_year,
+        missing_rate=args.missing_rate
+    )
+    print(f"wrote {len(paths)} workbooks to {args.directory}", file=sys.stderr)
+    return 0
+
+
+def add_universe_arguments(parser):
+    parser.add_argument("--metrics", type=int, default=12, help="metrics per company (default: 12)")
+    parser.add_argument("--years", type=int, default=5, help="years per metric (default: 5)")
+    parser.add_argument("--industries", type=int, default=3, help="industries (default: 3)")
+    parser.add_argument("--seed", type=int, default=0, help="random seed (default: 0)")
+
+
+def add_data_arguments(parser):
+    parser.add_argument("--data-dir", help="folder of company workbooks (default: embedded sample data)")
+    parser.add_argument("--cache-dir", help="parsed workbook cache (default: <data dir>/.ma_cache)")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m dorenth", description="Dorenth M&A tool")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    value = commands.add_parser("value", help="value a CSV of targets from industry comparables")
+    value.add_argument("targets", help="CSV with industry, ebitda and optional revenue columns")
+    value.add_argument("-o", "--output", help="output CSV (default: stdout)")
+    value.add_argument("--as-of-year", type=int, help="year of comparable multiples (default: latest)")
+    add_data_arguments(value)
+    value.set_defaults(func=cmd_value)
+
+    export = commands.add_parser("export", help="stream the M&A summary or the whole panel to CSV or XLSX")
+    export.add_argument("table", choices=["panel", "summary"], help="company x metric x year panel or M&A summary")
+    export.add_argument("-o", "--output", help="output file (default: CSV on stdout)")
+    export.add_argument("--format", choices=["csv", "xlsx"], help="default: from the output extension, else csv")
+    export.add_argument("--metrics", nargs="+", help="panel metrics to export (default: all, derived included)")
+    export.add_argument("--as-of-year", type=int, help="summary year (default: latest)")
+    add_data_arguments(export)
+    export.set_defaults(func=cmd_export)
+
+    bench = commands.add_parser("bench", help="time and memory-profile the pipeline on synthetic universes")
+    bench.add_argument("--sizes", type=int, nargs="+", default=[100, 1_000, 10_000],
+                       help="universe sizes in companies (default: 100 1000 10000)")
+    bench.add_argument("--repeat", type=int, default=5, help="timed runs per case (default: 5)")
+    bench.add_argument("--cases", nargs="+", help="cases to run (default: all)")
+    bench.add_argument("-o", "--output", help="JSON results file (default: stdout)")
+    add_universe_arguments(bench)
+    bench.set_defaults(func=cmd_bench)
+
+    synthetic = commands.add_parser("synthetic", help="write a synthetic universe as a folder of workbooks")
+    synthetic.add_argument("directory", help="output folder, one sub-folder per industry")
+    synthetic.add_argument("--companies", type=int, default=1_000, help="companies (default: 1000)")
+    synthetic.add_argument("--start-year", type=int, default=2020, help="first year (default: 2020)")
+    synthetic.add_argument("--missing-rate", type=float, default=0.0, help="share of cells left blank (default: 0)")
+    add_universe_arguments(synthetic)
+    synthetic.set_defaults(func=cmd_synthetic)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    return args.func(args)
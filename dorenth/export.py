@@ -0,0 +1,127 @@
+"""
+Streaming export of tables and whole panels to CSV or XLSX.
+Rows are generated a chunk at a time straight from the panel arrays and written as
+they come, CSV through csv.writer and XLSX through an openpyxl write-only workbook,
+so memory stays at one chunk however many cells the export holds.
+"""
+import csv
+import io
+import tempfile
+
+import numpy as np
+
+EXPORT_FORMATS = ("csv", "xlsx")
+
+MIME_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+}
+
+# Companies turned into rows at a time when exporting a panel
+CHUNK_COMPANIES = 512
+
+# Rows per worksheet in an XLSX file; longer exports continue on another sheet
+MAX_XLSX_ROWS = 1_048_576
+
+# Largest panel (companies x metrics x years values) offered as an in-app download.
+# Streamlit reads a download's whole file into memory and keeps it in its media file
+# store, so only the CLI export streams larger panels end to end.
+MAX_DOWNLOAD_CELLS = 2_000_000
+
+
+def frame_rows(df, index=True, chunk_size=10_000):
+    """Header then rows of a DataFrame, converted a chunk at a time"""
+    columns = [" ".join(map(str, c)) if isinstance(c, tuple) else str(c) for c in df.columns]
+    if index:
+        columns = [str(name or "") for name in df.index.names] + columns
+    yield columns
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        if index:
+            chunk = chunk.reset_index()
+        yield from chunk.itertuples(index=False, name=None)
+
+
+def panel_cells(panel, metrics=None, formulas=None):
+    """Values a panel export covers, empty cells included"""
+    metrics = panel.available_metrics(formulas) if metrics is None else list(metrics)
+    return len(panel) * len(metrics) * len(panel.years)
+
+
+def panel_rows(panel, codes=None, metrics=None, formulas=None, chunk_size=CHUNK_COMPANIES):
+    """
+    Header then one row per company and metric with a column per year, reported and
+    derived metrics alike (all of panel.available_metrics by default). Rows with no
+    value in any year are skipped.
+    """
+    codes = np.arange(len(panel)) if codes is None else np.asarray(codes, dtype=np.intp)
+    metrics = panel.available_metrics(formulas) if metrics is None else list(metrics)
+    yield ["Company", "Industry", "Metric"] + [str(y) for y in panel.years]
+
+    blocks = [panel.block(m, formulas) for m in metrics]
+    for start in range(0, len(codes), chunk_size):
+        chunk = codes[start:start + chunk_size]
+        values = np.stack([block[chunk] for block in blocks], axis=1) if blocks else np.empty((len(chunk), 0, 0))
+        names = panel.names[chunk]
+        industries = panel.industry_labels(chunk)
+        for i, j in zip(*np.nonzero(~np.isnan(values).all(axis=2))):
+            yield [names[i], industries[i], metrics[j], *values[i, j].tolist()]
+
+
+def _clean(row):
+    """Missing values (NaN, None) become empty cells"""
+    return [None if v is None or (isinstance(v, float) and v != v) else v for v in row]
+
+
+def write_csv(rows, f):
+    """Write rows to a text file opened with newline=''"""
+    csv.writer(f).writerows(_clean(row) for row in rows)
+
+
+def write_xlsx(rows, f, sheet_name="Data"):
+    """
+    Write rows to a binary file through a write-only workbook, which streams each row
+    to disk; past MAX_XLSX_ROWS the rows continue on a new sheet under the same header
+    """
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    rows = iter(rows)
+    header = next(rows, None)
+    sheet, n_rows, n_sheets = None, 0, 0
+    for row in rows:
+        if sheet is None or n_rows == MAX_XLSX_ROWS:
+            n_sheets += 1
+            sheet = workbook.create_sheet(sheet_name if n_sheets == 1 else f"{sheet_name} {n_sheets}")
+            sheet.append(header)
+            n_rows = 1
+        sheet.append(_clean(row))
+        n_rows += 1
+    if sheet is None:
+        workbook.create_sheet(sheet_name).append(header or [])
+    workbook.save(f)
+
+
+def write_export(rows, f, fmt):
+    """Write rows to a binary file object as fmt ("csv" or "xlsx")"""
+    if fmt == "csv":
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="")
+        write_csv(rows, text)
+        text.flush()
+        text.detach()
+    elif fmt == "xlsx":
+        write_xlsx(rows, f)
+    else:
+        raise ValueError(f"unknown export format {fmt!r}, expected one of {', '.join(EXPORT_FORMATS)}")
+
+
+def spool_export(rows, fmt):
+    """Export written to an anonymous temporary file on disk, rewound for reading"""
+    f = tempfile.TemporaryFile()
+    try:
+        write_export(rows, f, fmt)
+    except BaseException:
+        f.close()
+        raise
+    f.seek(0)
+    return f
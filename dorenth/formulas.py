@@ -0,0 +1,164 @@
+"""
+Derived metrics defined by arithmetic formulas over statement lines.
+A formula such as "(Total_Debt - Cash) / EBITDA" is parsed once and evaluated over
+whole (companies, years) blocks on demand; the panel caches each result for its
+lifetime, and a reloaded dataset is a new panel, so nothing is ever stale.
+"""
+import ast
+import hashlib
+import json
+
+import numpy as np
+
+# Ratios the tool derives whenever a workbook does not report them
+DEFAULT_FORMULAS = {
+    "EV_EBITDA_Multiple": "Enterprise_Value / EBITDA",
+    "EV_Revenue_Multiple": "Enterprise_Value / Revenue",
+    "PE_Ratio": "Market_Cap / Net_Income",
+    "Debt_EBITDA_Ratio": "Total_Debt / EBITDA",
+    "Net_Debt": "Total_Debt - Cash",
+    "Net_Debt_EBITDA_Ratio": "(Total_Debt - Cash) / EBITDA",
+    "EBITDA_Margin_Percent": "EBITDA / Revenue * 100",
+    "ROE_Percent": "Net_Income / Total_Equity * 100"
+}
+
+
+class FormulaError(ValueError):
+    """A formula that does not parse, uses unsupported syntax or depends on itself"""
+
+
+def _ratio(a, b):
+    """Division that is NaN for zero or negative denominators (no multiple on a loss)"""
+    return np.where(b > 0, np.divide(a, b), np.nan)
+
+
+def _log(x):
+    return np.where(x > 0, np.log(x), np.nan)
+
+
+_BINARY = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: _ratio,
+    ast.Pow: np.power
+}
+_UNARY = {ast.USub: np.negative, ast.UAdd: np.positive}
+_FUNCTIONS = {"abs": np.abs, "log": _log}
+
+
+class Formula:
+    """
+    One derived metric: + - * / ** over metric names and numbers, plus abs() and log().
+    Division yields NaN when the denominator is zero or negative, so a P/E on a loss
+    or a leverage ratio on negative EBITDA is reported as not meaningful.
+    """
+
+    def __init__(self, name, source):
+        self.name = name
+        self.source = source
+        try:
+            tree = ast.parse(str(source).strip(), mode="eval").body
+        except SyntaxError:
+            raise FormulaError(f"{name}: cannot parse {source!r}") from None
+        self.inputs = []
+        self._check(tree)
+        self.tree = tree
+        # Canonical spelling, so formulas differing only in spacing share a cache entry
+        self.text = ast.unparse(tree)
+
+    def _check(self, node):
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            self._check(node.left)
+            self._check(node.right)
+        elif isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            self._check(node.operand)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id in _FUNCTIONS:
+            if len(node.args) != 1 or node.keywords:
+                raise FormulaError(f"{self.name}: {node.func.id}() takes exactly one argument")
+            self._check(node.args[0])
+        elif isinstance(node, ast.Name):
+            if node.id not in self.inputs:
+                self.inputs.append(node.id)
+        elif isinstance(node, ast.Constant) and isinstance(node.value, (int, float)) and not isinstance(node.value, bool):
+            pass
+        else:
+            raise FormulaError(f"{self.name}: unsupported expression {ast.unparse(node)!r}")
+
+    def evaluate(self, resolve):
+        """Value of the formula, with resolve(name) supplying each input block"""
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return self._eval(self.tree, resolve)
+
+    def _eval(self, node, resolve):
+        if isinstance(node, ast.BinOp):
+            return _BINARY[type(node.op)](self._eval(node.left, resolve), self._eval(node.right, resolve))
+        if isinstance(node, ast.UnaryOp):
+            return _UNARY[type(node.op)](self._eval(node.operand, resolve))
+        if isinstance(node, ast.Call):
+            return _FUNCTIONS[node.func.id](self._eval(node.args[0], resolve))
+        if isinstance(node, ast.Name):
+            return resolve(node.id)
+        return float(node.value)
+
+
+class FormulaSet:
+    """
+    Immutable set of named formulas; formulas may build on each other but not in a cycle.
+    keys[name] identifies a formula together with everything it depends on and is
+    what panels cache derived values under; token identifies the whole set.
+    """
+
+    def __init__(self, formulas=None):
+        self.formulas = {}
+        for name, source in (formulas or {}).items():
+            self.formulas[name] = source if isinstance(source, Formula) else Formula(name, source)
+
+        self.keys = {}
+        for name in self.formulas:
+            self._key(name, ())
+        definitions = "\n".join(f"{name}={f.text}" for name, f in sorted(self.formulas.items()))
+        self.token = hashlib.blake2b(definitions.encode(), digest_size=16).hexdigest()
+
+    def _key(self, name, path):
+        if name in self.keys:
+            return self.keys[name]
+        if name in path:
+            raise FormulaError(f"{name}: circular definition via {' -> '.join(path + (name,))}")
+        formula = self.formulas[name]
+        deps = [self._key(d, path + (name,)) for d in formula.inputs if d in self.formulas and d != name]
+        if name in formula.inputs:
+            raise FormulaError(f"{name}: formula refers to itself")
+        key = f"{name}={formula.text}" + (f" [{'; '.join(deps)}]" if deps else "")
+        self.keys[name] = key
+        return key
+
+    def __contains__(self, name):
+        return name in self.formulas
+
+    def __iter__(self):
+        return iter(self.formulas)
+
+    def __len__(self):
+        return len(self.formulas)
+
+    def get(self, name):
+        return self.formulas.get(name)
+
+    def extend(self, formulas):
+        """New set with formulas added, replacing same-named ones"""
+        return FormulaSet({**self.formulas, **formulas})
+
+
+DEFAULT_FORMULA_SET = FormulaSet(DEFAULT_FORMULAS)
+
+
+def load_formulas(path=None):
+    """Default formulas plus those in a JSON file of {metric name: formula}, when given"""
+    if not path:
+        return DEFAULT_FORMULA_SET
+    with open(path, encoding="utf-8") as f:
+        extra = json.load(f)
+    if not isinstance(extra, dict):
+        raise FormulaError(f"{path}: expected a JSON object of metric name to formula")
+    return DEFAULT_FORMULA_SET.extend(extra)
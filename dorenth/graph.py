@@ -0,0 +1,111 @@
+"""
+Memoized computation graph for the app's stages.
+Each node is a function whose result is cached on its arguments, normalized to keys
+(panels and formula sets by their token, sequences as tuples), in a bounded LRU.
+Nodes may read other nodes. There is no explicit invalidation: the keys do it. A new
+dataset version has a new panel token and an edited formula set a new formula token,
+so either misses every node that reads it, while a widget change only recomputes the
+nodes whose arguments changed; stale entries age out of the LRU.
+"""
+import inspect
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from dorenth import profiling
+
+
+class Node:
+    """One stage: its function, LRU of results and hit/miss counters"""
+
+    def __init__(self, name, func, max_entries):
+        self.name = name
+        self.func = func
+        self.signature = inspect.signature(func)
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.seconds = 0.0
+
+
+class ComputeGraph:
+    """
+    Named nodes registered with node(), evaluated with get(name, *args, **kwargs).
+    key_funcs maps a type to the function giving its key, like hash_funcs in
+    st.cache_data; results are shared between callers and must not be modified.
+    """
+
+    def __init__(self, key_funcs=None):
+        self.key_funcs = dict(key_funcs or {})
+        self.nodes = {}
+
+    def node(self, name, max_entries=32):
+        """Decorator registering func as the node name, keeping up to max_entries results"""
+        def register(func):
+            self.nodes[name] = Node(name, func, max_entries)
+            return func
+        return register
+
+    def key(self, value):
+        """Hashable key of one argument"""
+        for cls, key_func in self.key_funcs.items():
+            if isinstance(value, cls):
+                return (cls.__name__, key_func(value))
+        if isinstance(value, (list, tuple)):
+            return tuple(self.key(v) for v in value)
+        if isinstance(value, dict):
+            return tuple(sorted((k, self.key(v)) for k, v in value.items()))
+        if isinstance(value, np.ndarray):
+            return (value.dtype.str, value.shape, value.tobytes())
+        if isinstance(value, np.generic):
+            return value.item()
+        return value
+
+    def get(self, name, *args, **kwargs):
+        """Result of node name for these arguments, computed only on a miss"""
+        node = self.nodes[name]
+        bound = node.signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = tuple(self.key(v) for v in bound.arguments.values())
+
+        with node.lock:
+            if key in node.entries:
+                node.entries.move_to_end(key)
+                node.hits += 1
+                profiling.count(f"graph.{name} (cached)")
+                return node.entries[key]
+            node.misses += 1
+
+        # Computed outside the lock; two sessions missing together both compute, the last one is kept
+        start = time.perf_counter()
+        with profiling.stage(f"graph.{name}"):
+            result = node.func(*bound.args, **bound.kwargs)
+        elapsed = time.perf_counter() - start
+
+        with node.lock:
+            node.seconds += elapsed
+            node.entries[key] = result
+            node.entries.move_to_end(key)
+            while len(node.entries) > node.max_entries:
+                node.entries.popitem(last=False)
+                node.evictions += 1
+        return result
+
+    def stats(self):
+        """Per node: cached entries, hits, misses, evictions and seconds spent computing"""
+        return [
+            {
+                "Node": node.name,
+                "Entries": len(node.entries),
+                "Hits": node.hits,
+                "Misses": node.misses,
+                "Evictions": node.evictions,
+                "Compute_Seconds": node.seconds
+            }
+            for node in self.nodes.values()
+        ]
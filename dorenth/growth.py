@@ -0,0 +1,140 @@
+"""
+Growth analytics for every company and metric at once.
+CAGR, year-over-year change and rolling statistics come from a few array operations
+over the year axis of a (companies, metrics, years) stack; industry ranks use one
+grouped rank over all columns instead of a per-company pandas apply.
+"""
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+from dorenth.panel import normalize_metric_name
+
+# Metrics whose growth is shown next to the M&A summary
+GROWTH_METRICS = ["Revenue", "EBITDA", "Net_Income"]
+
+
+def growth_rates(values, window):
+    """
+    (yoy, cagr) along the last axis, NaN where undefined.
+    YoY change is relative to the absolute prior value, so a loss narrowing counts as growth;
+    CAGR over window years needs a positive value at both ends.
+    """
+    yoy = np.full(values.shape, np.nan)
+    cagr = np.full(values.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        prev, cur = values[..., :-1], values[..., 1:]
+        yoy[..., 1:] = np.where(prev != 0, (cur - prev) / np.abs(prev), np.nan)
+        if 0 < window < values.shape[-1]:
+            base, end = values[..., :-window], values[..., window:]
+            cagr[..., window:] = np.where((base > 0) & (end > 0), (end / base) ** (1.0 / window) - 1.0, np.nan)
+    return yoy, cagr
+
+
+def rolling(values, window, reduce):
+    """reduce(axis=-1) over each trailing window of the last axis; NaN unless the whole window is present"""
+    out = np.full(values.shape, np.nan)
+    if 0 < window <= values.shape[-1]:
+        out[..., window - 1:] = reduce(sliding_window_view(values, window, axis=-1), axis=-1)
+    return out
+
+
+def industry_ranks(panel, values):
+    """
+    Rank (1 = highest) and percentile (share of the industry at or below, highest = 100)
+    of each company within its industry, for every column of a (companies, k) array at once;
+    NaN values stay unranked. Both come from a single ascending rank.
+    """
+    groups = pd.DataFrame(values).groupby(panel.company_industry)
+    at_or_below = groups.rank(method="max").to_numpy()
+    count = groups.transform("count").to_numpy()
+    return count - at_or_below + 1, at_or_below / count * 100
+
+
+class GrowthAnalytics:
+    """
+    CAGR over window years, YoY change, rolling mean and rolling growth volatility
+    (standard deviation of the last window YoY changes) for every company, metric and
+    year of a panel, each a (companies, metrics, years) array. Metrics derived from
+    formulas sit alongside the reported ones. Seven such arrays over every metric are
+    several times the panel's size, so pass metrics to compute only those on show.
+    """
+
+    def __init__(self, panel, window=3, formulas=None, metrics=None):
+        formulas = panel.formulas if formulas is None else formulas
+        self.panel = panel
+        self.window = window
+        self.metrics = panel.available_metrics(formulas) if metrics is None else list(dict.fromkeys(metrics))
+
+        shape = (len(panel), len(self.metrics), len(panel.years))
+        if self.metrics:
+            self.values = np.stack([panel.block(m, formulas) for m in self.metrics], axis=1)
+        else:
+            self.values = np.empty(shape)
+        self.yoy, self.cagr = growth_rates(self.values, window)
+        self.rolling_mean = rolling(self.values, window, np.mean)
+        if window >= 2:
+            self.volatility = rolling(self.yoy, window, lambda a, axis: np.std(a, axis=axis, ddof=1))
+        else:
+            self.volatility = np.full(shape, np.nan)
+
+        rank, percentile = industry_ranks(panel, self.cagr.reshape(len(panel), -1))
+        self.cagr_rank = rank.reshape(shape)
+        self.cagr_percentile = percentile.reshape(shape)
+
+        self.metric_index = {m: i for i, m in enumerate(self.metrics)}
+        self.metric_lookup = {}
+        for i, m in enumerate(self.metrics):
+            self.metric_lookup.setdefault(normalize_metric_name(m), i)
+
+    def metric_code(self, metric_name):
+        code = self.metric_index.get(metric_name)
+        if code is None:
+            code = self.metric_lookup.get(normalize_metric_name(metric_name))
+        return code
+
+    def _at(self, metric_name, year, codes):
+        """Every statistic of one metric in one year for the given company rows"""
+        m = self.metric_code(metric_name)
+        arrays = [self.values, self.yoy, self.cagr, self.rolling_mean, self.volatility,
+                  self.cagr_rank, self.cagr_percentile]
+        if m is None:
+            return [np.full(len(codes), np.nan) for _ in arrays]
+        y = self.panel.year_index[int(year)]
+        return [a[codes, m, y] for a in arrays]
+
+    def _codes(self, codes):
+        return np.arange(len(self.panel)) if codes is None else np.asarray(codes, dtype=np.intp)
+
+    def table(self, metric_name, as_of_year, codes=None):
+        """Per-company growth of one metric in the as-of year, ranked on CAGR within each whole industry"""
+        codes = self._codes(codes)
+        value, yoy, cagr, mean, volatility, rank, percentile = self._at(metric_name, as_of_year, codes)
+        w = self.window
+        return pd.DataFrame({
+            "Company": self.panel.names[codes],
+            "Industry": self.panel.industry_labels(codes),
+            f"{metric_name}_{as_of_year}": value,
+            "YoY_Percent": yoy * 100,
+            f"CAGR_{w}Y_Percent": cagr * 100,
+            f"Rolling_Mean_{w}Y": mean,
+            f"Volatility_{w}Y_Percent": volatility * 100,
+            "CAGR_Industry_Rank": rank,
+            "CAGR_Industry_Percentile": percentile
+        })
+
+    def summary(self, codes=None, as_of_year=None, metrics=GROWTH_METRICS):
+        """CAGR, YoY change and industry CAGR percentile of several metrics side by side"""
+        codes = self._codes(codes)
+        if as_of_year is None:
+            as_of_year = int(self.panel.years[-1])
+        out = {
+            "Company": self.panel.names[codes],
+            "Industry": self.panel.industry_labels(codes)
+        }
+        for metric in metrics:
+            _, yoy, cagr, _, _, _, percentile = self._at(metric, as_of_year, codes)
+            out[f"{metric}_CAGR_{self.window}Y_Percent"] = cagr * 100
+            out[f"{metric}_YoY_Percent"] = yoy * 100
+            out[f"{metric}_CAGR_Industry_Percentile"] = percentile
+        return pd.DataFrame(out)
@@ -0,0 +1,223 @@
+"""
+Bulk loader for company workbooks in the ALPHA.xlsx / OMEGA.xlsx layout:
+metric names in column B, years across the header row from column C onward.
+Workbooks in <data dir>/<Industry>/<Company>.xlsx become panel rows keyed
+"<Industry>_<Company>"; files directly in the data dir use a default industry.
+"""
+import math
+import multiprocessing
+import os
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from openpyxl import load_workbook
+
+from dorenth.cache import WorkbookCache, directory_scope, file_key
+from dorenth.panel import assemble_panel
+
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_THRESHOLD = 8
+
+# One workbook to parse, and the outcome of parsing it
+IngestJob = namedtuple("IngestJob", ["path", "industry", "name"])
+IngestError = namedtuple("IngestError", ["path", "error"])
+LoadResult = namedtuple("LoadResult", ["panel", "errors"])
+
+
+def _as_year(cell):
+    """Year number held by a header cell, or None for labels such as 'CAGR'"""
+    if isinstance(cell, bool):
+        return None
+    if isinstance(cell, (int, float)) and float(cell).is_integer():
+        year = int(cell)
+    elif isinstance(cell, str) and cell.strip().isdigit():
+        year = int(cell.strip())
+    else:
+        return None
+    return year if 1900 <= year <= 2200 else None
+
+
+def _to_float(cell):
+    """Numeric value of a cell; text such as '(11.7%)' or '1,250' is parsed, anything else is NaN"""
+    if cell is None or isinstance(cell, bool):
+        return math.nan
+    if isinstance(cell, (int, float)):
+        return float(cell)
+    if not isinstance(cell, str):
+        return math.nan
+
+    text = cell.strip().replace(",", "")
+    negative = text.startswith("(") and text.endswith(")")
+    text = text.strip("()")
+    scale = 1.0
+    if text.endswith("%"):
+        text, scale = text[:-1], 0.01
+    try:
+        value = float(text) * scale
+    except ValueError:
+        return math.nan
+    return -value if negative else value
+
+
+def parse_workbook(path, sheet_name="Sheet1"):
+    """
+    Stream one workbook with openpyxl in read-only mode.
+    Returns (metrics, years, values) with values shaped (len(metrics), len(years));
+    the first row of a repeated metric name wins.
+    """
+    wb = load_workbook(path, read_only=True, data_only=True)
+    try:
+        ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.worksheets[0]
+        rows = ws.iter_rows(min_col=2, values_only=True)
+
+        # Header row: the first row carrying years from column C onward
+        year_cols = []
+        for row in rows:
+            seen_years = set()
+            for j, cell in enumerate(row[1:], start=1):
+                year = _as_year(cell)
+                if year is not None and year not in seen_years:
+                    seen_years.add(year)
+                    year_cols.append((j, year))
+            if year_cols:
+                break
+        if not year_cols:
+            raise ValueError("no year header row found")
+
+        metrics, values, seen = [], [], set()
+        for row in rows:
+            if not row or row[0] is None:
+                continue
+            metric = str(row[0]).strip()
+            if not metric or metric in seen:
+                continue
+            seen.add(metric)
+            metrics.append(metric)
+            values.append([_to_float(row[j]) if j < len(row) else math.nan for j, _ in year_cols])
+    finally:
+        wb.close()
+
+    if not metrics:
+        raise ValueError("no metric rows found")
+    return metrics, [y for _, y in year_cols], np.array(values, dtype=np.float64)
+
+
+def _parse_job(job, sheet_name="Sheet1"):
+    """Pool worker: parse one job and report failures instead of raising"""
+    try:
+        return job, parse_workbook(job.path, sheet_name), None
+    except Exception as exc:
+        return job, None, f"{type(exc).__name__}: {exc}"
+
+
+def discover_workbooks(directory, default_industry="Other"):
+    """Workbook jobs under a data directory, in a stable order"""
+    jobs = []
+    for root, dirs, files in os.walk(directory):
+        # Hidden folders hold caches and tooling, not company data
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        rel = os.path.relpath(root, directory)
+        industry = default_industry if rel == os.curdir else rel.split(os.sep)[0]
+        for filename in sorted(files):
+            stem, suffix = os.path.splitext(filename)
+            # Skip Excel lock files left behind by open workbooks
+            if suffix.lower() in WORKBOOK_SUFFIXES and not filename.startswith("~$"):
+                jobs.append(IngestJob(os.path.join(root, filename), industry, stem))
+    return jobs
+
+
+def parse_jobs(jobs, sheet_name="Sheet1", max_workers=None):
+    """Parse jobs across a process pool; yields (job, parsed, error) in job order"""
+    jobs = list(jobs)
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    max_workers = min(max_workers, len(jobs))
+
+    if max_workers <= 1 or len(jobs) < PARALLEL_THRESHOLD:
+        for job in jobs:
+            yield _parse_job(job, sheet_name)
+        return
+
+    # spawn rather than fork: the Streamlit server is multi-threaded
+    context = multiprocessing.get_context("spawn")
+    chunksize = max(1, len(jobs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers, mp_context=context) as pool:
+        yield from pool.map(_parse_job, jobs, [sheet_name] * len(jobs), chunksize=chunksize)
+
+
+def parse_jobs_cached(jobs, cache, sheet_name="Sheet1", max_workers=None):
+    """
+    Like parse_jobs, but unchanged workbooks are served from the cache and
+    only new or edited ones are parsed (and then cached).
+    Returns the (job, parsed, error) results in job order and a {path: cache key} map.
+    """
+    jobs = list(jobs)
+    results, keys, misses = {}, {}, []
+    for job in jobs:
+        try:
+            keys[job] = file_key(job.path, sheet_name)
+        except OSError as exc:
+            results[job] = (job, None, f"{type(exc).__name__}: {exc}")
+            continue
+        parsed = cache.load(keys[job])
+        if parsed is None:
+            misses.append(job)
+        else:
+            results[job] = (job, parsed, None)
+
+    for job, parsed, error in parse_jobs(misses, sheet_name, max_workers):
+        if parsed is not None:
+            try:
+                cache.store(keys[job], parsed)
+            except OSError:
+                # A read-only cache still leaves us with the fresh parse
+                pass
+        results[job] = (job, parsed, error)
+
+    return [results[job] for job in jobs], {job.path: key for job, key in keys.items()}
+
+
+def collect_blocks(results):
+    """Split parse results into panel blocks and an error report"""
+    blocks, errors, seen = [], [], set()
+    for job, parsed, error in results:
+        if error is not None:
+            errors.append(IngestError(job.path, error))
+            continue
+        key = (job.industry, job.name)
+        if key in seen:
+            errors.append(IngestError(job.path, f"duplicate company {job.name!r} in {job.industry}"))
+            continue
+        seen.add(key)
+        metrics, years, values = parsed
+        blocks.append((job.industry, job.name, metrics, years, values))
+    return blocks, errors
+
+
+def open_cache(cache_dir, data_dir):
+    """WorkbookCache of data_dir's entries under cache_dir, or None when it cannot be created"""
+    if cache_dir is None:
+        return None
+    try:
+        return WorkbookCache(os.path.join(cache_dir, directory_scope(data_dir)))
+    except OSError:
+        return None
+
+
+def load_workbook_dir(directory, default_industry="Other", sheet_name="Sheet1", max_workers=None, cache_dir=None):
+    """
+    Ingest every workbook under a directory into one panel plus a per-file error report.
+    With a cache_dir, parsed workbooks are reused across restarts until their content changes.
+    """
+    jobs = discover_workbooks(directory, default_industry)
+    cache = open_cache(cache_dir, directory)
+    if cache is None:
+        results = parse_jobs(jobs, sheet_name, max_workers)
+    else:
+        results, keys = parse_jobs_cached(jobs, cache, sheet_name, max_workers)
+        cache.prune(set(keys.values()))
+    blocks, errors = collect_blocks(results)
+    return LoadResult(assemble_panel(blocks), errors)
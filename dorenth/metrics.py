@@ -0,0 +1,136 @@
+"""M&A metric extraction, summaries and trend datasets over a company panel"""
+import numpy as np
+import pandas as pd
+
+from dorenth.aggregates import AggregateStore
+
+
+# --- M&A Specific Metric Extraction ---
+def extract_metric(panel, company, metric_name, formulas=None):
+    """Extract specific metric data for a company as a read-only (years, values) view"""
+    return panel.series(company, metric_name, formulas)
+
+
+# --- M&A Valuation Functions ---
+# Metrics shown in the M&A summary; level metrics are labelled with the as-of year
+SUMMARY_METRICS = [
+    ("EBITDA", True),
+    ("Revenue", True),
+    ("Enterprise_Value", True),
+    ("Market_Cap", True),
+    ("EV_EBITDA_Multiple", False),
+    ("Debt_EBITDA_Ratio", False),
+    ("ROE_Percent", False)
+]
+
+
+def calculate_ma_metrics(company_data, selected_companies=None, as_of_year=None):
+    """Calculate M&A relevant metrics for selected companies (all when None) in one array pass"""
+    if selected_companies is None:
+        codes = np.arange(len(company_data))
+    else:
+        codes = company_data.company_codes(selected_companies)
+    if as_of_year is None:
+        as_of_year = int(company_data.years[-1])
+
+    if len(codes) == 0 or len(company_data.years) == 0:
+        return pd.DataFrame()
+
+    latest = company_data.cross_section(codes, [m for m, _ in SUMMARY_METRICS], as_of_year)
+
+    ma_summary = {
+        "Company": company_data.names[codes],
+        "Industry": company_data.industry_labels(codes)
+    }
+    for i, (metric, dated) in enumerate(SUMMARY_METRICS):
+        ma_summary[f"{metric}_{as_of_year}" if dated else metric] = latest[:, i]
+
+    return pd.DataFrame(ma_summary)
+
+
+def summarize_industries(ma_summary_df, as_of_year):
+    """Per-industry mean/std of multiples, leverage and ROE plus total EBITDA"""
+    return ma_summary_df.groupby('Industry').agg({
+        'EV_EBITDA_Multiple': ['mean', 'std'],
+        'Debt_EBITDA_Ratio': ['mean', 'std'],
+        'ROE_Percent': ['mean', 'std'],
+        f'EBITDA_{as_of_year}': 'sum'
+    }).round(2)
+
+
+def industry_summary(aggregates, companies=None, as_of_year=None):
+    """
+    summarize_industries read from an AggregateStore instead of a summary frame:
+    per-industry mean/std of multiples, leverage and ROE plus total EBITDA
+    for the given companies (all when None)
+    """
+    if as_of_year is None:
+        as_of_year = aggregates.years[-1]
+    stats = aggregates.stats(companies, as_of_year)
+    if not stats:
+        return pd.DataFrame()
+
+    columns = {}
+    for metric in ["EV_EBITDA_Multiple", "Debt_EBITDA_Ratio", "ROE_Percent"]:
+        m = aggregates.metric_index[metric]
+        columns[(metric, "mean")] = [s.mean[m] for s in stats.values()]
+        columns[(metric, "std")] = [s.std[m] for s in stats.values()]
+    m = aggregates.metric_index["EBITDA"]
+    columns[(f"EBITDA_{as_of_year}", "sum")] = [s.total[m] for s in stats.values()]
+
+    return pd.DataFrame(columns, index=pd.Index(list(stats), name="Industry")).round(2)
+
+
+def industry_quartiles(aggregates, metric, companies=None, as_of_year=None):
+    """Per-industry count, min, approximate quartiles and max of one aggregated metric"""
+    if as_of_year is None:
+        as_of_year = aggregates.years[-1]
+    stats = aggregates.stats(companies, as_of_year)
+    m = aggregates.metric_index[metric]
+    return pd.DataFrame({
+        "Count": [int(s.count[m]) for s in stats.values()],
+        "Min": [s.minimum[m] for s in stats.values()],
+        "P25": [s.quantile(0.25)[m] for s in stats.values()],
+        "Median": [s.quantile(0.5)[m] for s in stats.values()],
+        "P75": [s.quantile(0.75)[m] for s in stats.values()],
+        "Max": [s.maximum[m] for s in stats.values()]
+    }, index=pd.Index(list(stats), name="Industry"))
+
+
+def derive_industry_aggregates(panel, previous=None, changed=None):
+    """
+    Industry aggregate store published with each dataset version; given the previous
+    version's store and the company keys changed since, only those are folded in
+    """
+    if previous is not None and changed is not None:
+        return previous.update(panel, changed)
+    return AggregateStore(panel)
+
+
+# --- Trend Analysis ---
+def build_trend_dataset(company_data, metric_name, selected_companies, formulas=None):
+    """
+    Long-format and pivoted (Year x Company) trend data for one metric,
+    reported or derived from formulas, gathered from the panel in one allocation
+    """
+    codes = company_data.company_codes(selected_companies)
+    years = company_data.years.astype(str).astype(object)
+    block = company_data.block(metric_name, formulas)[codes]
+
+    names = company_data.names[codes]
+    keep = ~np.isnan(block.ravel())
+    plot_df = pd.DataFrame({
+        "Year": np.tile(years, len(codes))[keep],
+        "Value": block.ravel()[keep],
+        "Company": np.repeat(names, len(years))[keep],
+        "Industry": np.repeat(company_data.industry_labels(codes), len(years))[keep]
+    })
+
+    pivot_df = pd.DataFrame(
+        block.T,
+        index=pd.Index(years, name="Year"),
+        columns=pd.Index(names, name="Company")
+    )
+    pivot_df = pivot_df.dropna(how="all").dropna(axis=1, how="all").sort_index(axis=1)
+
+    return plot_df, pivot_df
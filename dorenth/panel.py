@@ -0,0 +1,217 @@
+"""Columnar company x metric x year store for the M&A tool"""
+import threading
+import uuid
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+from dorenth.formulas import DEFAULT_FORMULA_SET
+
+# Year axis and the matching values of one company's metric, both read-only views
+MetricSeries = namedtuple("MetricSeries", ["years", "values"])
+
+# Derived (companies, years) blocks each panel keeps, least recently used dropped first
+DERIVED_CACHE_SIZE = 32
+
+
+def normalize_metric_name(name):
+    """Canonical lookup key for a metric: case, spacing and underscores ignored"""
+    return "_".join(str(name).replace("_", " ").lower().split())
+
+
+class MAPanel:
+    """
+    Dense float store of every company's metrics across years.
+    values[c, m, y] holds metric m of company c in year y (NaN when missing);
+    companies, industries, metrics and years are the index tables for each axis.
+    Metrics with a formula in formulas are derived on demand where not reported.
+    """
+
+    def __init__(self, values, companies, names, company_industry, industries, metrics, years, formulas=None):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        # Shared by every session, so nobody may write into it
+        values.flags.writeable = False
+        self.values = values
+        self.companies = list(companies)
+        self.names = np.asarray(names, dtype=object)
+        self.company_industry = np.asarray(company_industry, dtype=np.int32)
+        self.industries = list(industries)
+        self.metrics = list(metrics)
+        self.years = np.asarray(years, dtype=np.int32)
+        # Identity of this immutable snapshot, used as a cache key
+        self.token = uuid.uuid4().hex
+        # Shared memory segment holding values (see dorenth.shared), None when private
+        self.segment = None
+
+        self.company_index = {c: i for i, c in enumerate(self.companies)}
+        self.industry_index = {ind: i for i, ind in enumerate(self.industries)}
+        self.metric_index = {m: i for i, m in enumerate(self.metrics)}
+        self.year_index = {int(y): i for i, y in enumerate(self.years)}
+        self.years.flags.writeable = False
+
+        # First spelling wins when two metrics normalize to the same key
+        self.metric_lookup = {}
+        for i, m in enumerate(self.metrics):
+            self.metric_lookup.setdefault(normalize_metric_name(m), i)
+        self._missing = np.full(len(self.years), np.nan)
+        self._missing.flags.writeable = False
+
+        self.formulas = DEFAULT_FORMULA_SET if formulas is None else formulas
+        self._derived = OrderedDict()
+        self._derived_lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.companies)
+
+    def __contains__(self, company):
+        return company in self.company_index
+
+    def __iter__(self):
+        return iter(self.companies)
+
+    @property
+    def nbytes(self):
+        return self.values.nbytes
+
+    def company_codes(self, companies):
+        """Row positions of the given company keys, unknown keys are skipped"""
+        index = self.company_index
+        return np.fromiter((index[c] for c in companies if c in index), dtype=np.intp)
+
+    def metric_code(self, metric_name):
+        """Position of a metric on the metric axis, or None when absent"""
+        code = self.metric_index.get(metric_name)
+        if code is None:
+            code = self.metric_lookup.get(normalize_metric_name(metric_name))
+        return code
+
+    def series(self, company, metric_name, formulas=None):
+        """Zero-copy view of one company's metric across all years"""
+        formulas = self.formulas if formulas is None else formulas
+        if metric_name in formulas:
+            return MetricSeries(self.years, self.block(metric_name, formulas)[self.company_index[company]])
+        code = self.metric_code(metric_name)
+        if code is None:
+            return MetricSeries(self.years, self._missing)
+        return MetricSeries(self.years, self.values[self.company_index[company], code])
+
+    def block(self, metric_name, formulas=None):
+        """
+        Read-only (companies, years) values of one metric.
+        Reported values win; a metric with a formula fills every cell the panel does not
+        report, evaluated over the whole panel at once and cached until evicted.
+        Metrics neither reported nor derivable are all NaN.
+        """
+        formulas = self.formulas if formulas is None else formulas
+        code = self.metric_code(metric_name)
+        stored = None if code is None else self.values[:, code]
+        formula = formulas.get(metric_name)
+        if formula is None:
+            if stored is None:
+                return np.broadcast_to(np.nan, (len(self.companies), len(self.years)))
+            return stored
+
+        key = formulas.keys[metric_name]
+        with self._derived_lock:
+            cached = self._derived.get(key)
+            if cached is not None:
+                self._derived.move_to_end(key)
+                return cached
+
+        if stored is not None and not np.isnan(stored).any():
+            derived = stored
+        else:
+            derived = formula.evaluate(lambda name: self.block(name, formulas))
+            derived = np.broadcast_to(derived, (len(self.companies), len(self.years)))
+            if stored is not None:
+                derived = np.where(np.isnan(stored), derived, stored)
+            derived = np.array(derived, dtype=np.float64)
+            derived.flags.writeable = False
+
+        with self._derived_lock:
+            self._derived[key] = derived
+            while len(self._derived) > DERIVED_CACHE_SIZE:
+                self._derived.popitem(last=False)
+        return derived
+
+    def cross_section(self, codes, metric_names, year, formulas=None):
+        """
+        Values of several metrics in one year for a set of company rows,
+        gathered in a single fancy-index as a (len(codes), len(metric_names)) array.
+        Derived metrics fill their gaps from formulas; any other metric the panel
+        does not carry comes back as a NaN column.
+        """
+        formulas = self.formulas if formulas is None else formulas
+        codes = np.asarray(codes, dtype=np.intp)
+        y = self.year_index[int(year)]
+        metric_codes = [self.metric_code(m) for m in metric_names]
+        cols = np.array([-1 if m is None else m for m in metric_codes], dtype=np.intp)
+        out = self.values[codes[:, None], cols[None, :], y]
+        out[:, cols < 0] = np.nan
+        for j, metric in enumerate(metric_names):
+            if metric in formulas and (cols[j] < 0 or np.isnan(out[:, j]).any()):
+                out[:, j] = self.block(metric, formulas)[codes, y]
+        return out
+
+    def available_metrics(self, formulas=None):
+        """Reported metrics followed by the derived ones the panel does not report"""
+        formulas = self.formulas if formulas is None else formulas
+        return list(self.metrics) + [m for m in formulas if self.metric_code(m) is None]
+
+    def industry_labels(self, codes):
+        """Industry name of each company row"""
+        return np.asarray(self.industries, dtype=object)[self.company_industry[codes]]
+
+    def industry_of(self, company):
+        return self.industries[self.company_industry[self.company_index[company]]]
+
+    def name_of(self, company):
+        return self.names[self.company_index[company]]
+
+
+def company_key(industry, name):
+    """Key a company is stored under in the panel"""
+    return f"{industry}_{name}"
+
+
+def assemble_panel(blocks):
+    """
+    Build a panel from per-company blocks.
+    Each block is (industry, name, metrics, years, values) with values shaped
+    (len(metrics), len(years)). Metrics keep first-seen order, years are sorted.
+    """
+    blocks = list(blocks)
+
+    metrics = {}
+    years = set()
+    industries = {}
+    for industry, _, block_metrics, block_years, _ in blocks:
+        industries.setdefault(industry, len(industries))
+        for metric in block_metrics:
+            metrics.setdefault(metric, len(metrics))
+        years.update(int(y) for y in block_years)
+    years = sorted(years)
+    year_pos = {y: i for i, y in enumerate(years)}
+
+    values = np.full((len(blocks), len(metrics), len(years)), np.nan)
+    companies, names, company_industry = [], [], []
+
+    for c, (industry, name, block_metrics, block_years, block_values) in enumerate(blocks):
+        rows = np.fromiter((metrics[m] for m in block_metrics), dtype=np.intp, count=len(block_metrics))
+        cols = np.fromiter((year_pos[int(y)] for y in block_years), dtype=np.intp, count=len(block_years))
+        values[c][np.ix_(rows, cols)] = np.asarray(block_values, dtype=np.float64)
+        companies.append(company_key(industry, name))
+        names.append(name.replace("_", " "))
+        company_industry.append(industries[industry])
+
+    return MAPanel(values, companies, names, company_industry, list(industries), list(metrics), years)
+
+
+def build_panel(records, years):
+    """Build a panel from {industry: {company: {metric: [values per year]}}}"""
+    blocks = []
+    for industry, companies in records.items():
+        for name, company_metrics in companies.items():
+            block = [[np.nan if v is None else v for v in vals] for vals in company_metrics.values()]
+            blocks.append((industry, name, list(company_metrics), years, block))
+    return assemble_panel(blocks)
@@ -0,0 +1,136 @@
+"""
+Nearest-neighbour comparable companies over normalized metric vectors.
+Each company is described by size, growth, margin, leverage and profitability in
+the as-of year; distances for a whole batch of queries come from one matrix product.
+"""
+import warnings
+
+import numpy as np
+
+# Features of a company, in the column order of PeerIndex.features
+PEER_FEATURES = [
+    "Log_Revenue",
+    "Log_EBITDA",
+    "Revenue_Growth",
+    "EBITDA_Margin",
+    "Debt_EBITDA_Ratio",
+    "ROE_Percent"
+]
+
+
+def _log_positive(x):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(x > 0, np.log(x), np.nan)
+
+
+def target_features(ebitda=None, revenue=None, revenue_growth=None, debt_ebitda=None, roe=None):
+    """Raw feature row for a target; unknown inputs stay NaN and are ignored in the distance"""
+    nan = np.nan
+    ebitda = nan if ebitda is None else float(ebitda)
+    revenue = nan if revenue is None else float(revenue)
+    margin = ebitda / revenue if revenue and revenue > 0 else nan
+    return np.array([
+        _log_positive(np.array(revenue)),
+        _log_positive(np.array(ebitda)),
+        nan if revenue_growth is None else revenue_growth,
+        margin,
+        nan if debt_ebitda is None else debt_ebitda,
+        nan if roe is None else roe
+    ], dtype=np.float64)
+
+
+def company_features(panel, as_of_year=None, growth_years=3):
+    """(companies, PEER_FEATURES) raw feature matrix; revenue growth is the CAGR over growth_years"""
+    if as_of_year is None:
+        as_of_year = int(panel.years[-1])
+    codes = np.arange(len(panel))
+    latest = panel.cross_section(codes, ["Revenue", "EBITDA", "Debt_EBITDA_Ratio", "ROE_Percent"], as_of_year)
+    revenue, ebitda = latest[:, 0], latest[:, 1]
+
+    # Shorten the growth window when the panel does not reach back far enough
+    y = panel.year_index[int(as_of_year)]
+    span = min(growth_years, y)
+    growth = np.full(len(codes), np.nan)
+    if span > 0:
+        base = panel.cross_section(codes, ["Revenue"], int(panel.years[y - span]))[:, 0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            growth = np.where((base > 0) & (revenue > 0), (revenue / base) ** (1.0 / span) - 1.0, np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        margin = np.where(revenue > 0, ebitda / revenue, np.nan)
+
+    return np.column_stack([
+        _log_positive(revenue),
+        _log_positive(ebitda),
+        growth,
+        margin,
+        latest[:, 2],
+        latest[:, 3]
+    ])
+
+
+class PeerIndex:
+    """
+    k-nearest-neighbour search over robustly standardized company features.
+    Features are centred on the median and scaled by the IQR; a company's missing
+    features are imputed at the median, a query's missing features are skipped.
+    """
+
+    def __init__(self, panel, as_of_year=None, growth_years=3, weights=None):
+        self.panel = panel
+        self.features = list(PEER_FEATURES)
+        self.raw = company_features(panel, as_of_year, growth_years)
+
+        with warnings.catch_warnings():
+            # Features no company reports are all-NaN columns
+            warnings.simplefilter("ignore", RuntimeWarning)
+            q25, center, q75 = np.nanpercentile(self.raw, [25, 50, 75], axis=0)
+        scale = q75 - q25
+        self.center = np.nan_to_num(center)
+        self.scale = np.where(np.isfinite(scale) & (scale > 0), scale, 1.0)
+        self.weights = np.ones(len(self.features)) if weights is None else np.asarray(weights, dtype=np.float64)
+
+        matrix = np.nan_to_num((self.raw - self.center) / self.scale) * self.weights
+        self.matrix = matrix
+        self.matrix_sq = matrix ** 2
+
+    def standardize(self, raw):
+        return (np.atleast_2d(raw) - self.center) / self.scale * self.weights
+
+    def distances(self, raw):
+        """
+        (queries, companies) Euclidean distances over each query's known features:
+        sum_f m_f (x_f - q_f)^2 expanded into three matrix products
+        """
+        q = self.standardize(raw)
+        known = ~np.isnan(q)
+        q = np.where(known, q, 0.0)
+        sq = self.matrix_sq @ known.T - 2.0 * (self.matrix @ q.T) + (q ** 2).sum(axis=1)
+        return np.sqrt(np.maximum(sq, 0.0)).T
+
+    def query(self, raw, k=5, industry=None, exclude=None):
+        """
+        k nearest companies for one or more raw feature rows.
+        Returns (codes, distances), each shaped (queries, k), nearest first;
+        industry restricts candidates, exclude drops company codes (e.g. the target itself),
+        and k shrinks when fewer candidates are left.
+        """
+        dist = self.distances(raw)
+        if industry is not None:
+            dist[:, self.panel.company_industry != self.panel.industry_index[industry]] = np.inf
+        if exclude is not None:
+            dist[:, np.asarray(exclude, dtype=np.intp)] = np.inf
+
+        # Filters are shared by every query, so each row has the same number of candidates
+        k = min(k, int(np.isfinite(dist[0]).sum()) if len(dist) else 0)
+        nearest = np.argpartition(dist, k - 1, axis=1)[:, :k] if k else np.empty((len(dist), 0), dtype=np.intp)
+        picked = np.take_along_axis(dist, nearest, axis=1)
+        order = np.argsort(picked, axis=1)
+        return np.take_along_axis(nearest, order, axis=1), np.take_along_axis(picked, order, axis=1)
+
+    def query_company(self, company, k=5, same_industry=False):
+        """Nearest peers of a company already in the panel, itself excluded"""
+        code = self.panel.company_index[company]
+        industry = self.panel.industries[self.panel.company_industry[code]] if same_industry else None
+        codes, distances = self.query(self.raw[code], k, industry=industry, exclude=[code])
+        return codes[0], distances[0]
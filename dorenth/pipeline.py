@@ -0,0 +1,76 @@
+"""
+The app's computation graph: summary, growth, trend dataset, figure, valuation and
+insights as nodes keyed on their real inputs. The dataset itself comes from the
+data source's snapshot; its panel and aggregate tokens key every node downstream of it.
+"""
+from dorenth.aggregates import AggregateStore
+from dorenth.charts import trend_figure
+from dorenth.formulas import FormulaSet
+from dorenth.graph import ComputeGraph
+from dorenth.growth import GrowthAnalytics
+from dorenth.metrics import build_trend_dataset, calculate_ma_metrics, industry_quartiles, industry_summary
+from dorenth.panel import MAPanel
+from dorenth.peers import PeerIndex
+from dorenth.search import CompanyIndex
+from dorenth.valuation import value_against_peers
+
+KEY_FUNCS = {
+    MAPanel: lambda panel: panel.token,
+    FormulaSet: lambda formulas: formulas.token,
+    AggregateStore: lambda aggregates: aggregates.token
+}
+
+
+def build_app_graph():
+    """Graph of the app's stages; share one per process so every session reuses its results"""
+    graph = ComputeGraph(KEY_FUNCS)
+
+    @graph.node("company_index", max_entries=4)
+    def company_index(panel):
+        """Industry, name/ticker and metric-range indexes"""
+        return CompanyIndex(panel)
+
+    @graph.node("summary", max_entries=64)
+    def summary(panel, companies, as_of_year):
+        """M&A summary table of the selected companies"""
+        return calculate_ma_metrics(panel, companies, as_of_year)
+
+    # A rerun reads two entries (the summary metrics and the trend metric); each holds
+    # seven (companies, metrics, years) arrays, so only a few are kept
+    @graph.node("growth", max_entries=4)
+    def growth(panel, window, formulas, metrics):
+        """CAGR, YoY and rolling statistics of every company in the given metrics"""
+        return GrowthAnalytics(panel, window, formulas, metrics)
+
+    @graph.node("trend", max_entries=64)
+    def trend(panel, metric, companies, formulas):
+        """(long, pivoted) trend dataset of one metric"""
+        return build_trend_dataset(panel, metric, companies, formulas)
+
+    @graph.node("figure", max_entries=32)
+    def figure(panel, metric, chart_type, companies, as_of_year, formulas):
+        """Trend chart; as_of_year is None for chart types that do not use it"""
+        plot_df, _ = graph.get("trend", panel, metric, companies, formulas)
+        return trend_figure(plot_df, chart_type, metric, as_of_year, (panel.years[0], panel.years[-1]))
+
+    @graph.node("peer_index", max_entries=8)
+    def peer_index(panel, as_of_year):
+        """Nearest-neighbour peer index"""
+        return PeerIndex(panel, as_of_year)
+
+    @graph.node("valuation", max_entries=64)
+    def valuation(panel, peers, ebitda, revenue, as_of_year, aggregates):
+        """(comparable valuation of a target, summary table of its comparables)"""
+        result = value_against_peers(panel, peers, ebitda, revenue, as_of_year, aggregates=aggregates)
+        return result, graph.get("summary", panel, peers, as_of_year)
+
+    @graph.node("insights", max_entries=32)
+    def insights(aggregates, companies, as_of_year):
+        """(industry analysis of the selection, benchmarks and EV/EBITDA quartiles of all companies)"""
+        return (
+            industry_summary(aggregates, companies, as_of_year),
+            industry_summary(aggregates),
+            industry_quartiles(aggregates, "EV_EBITDA_Multiple")
+        )
+
+    return graph
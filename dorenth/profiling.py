@@ -0,0 +1,269 @@
+"""
+Opt-in profiling of app reruns.
+A Profiler started at the top of a rerun records wall time, calls and allocated memory
+(through tracemalloc) per stage: the app's sections, marked one after another with
+section(), and nested stages such as graph nodes, marked with stage(). Both helpers
+are no-ops on threads with no active profiler, so instrumented code costs nothing
+when profiling is off. A Sampler captures a statistical profile of one thread by
+reading its stack from another thread, without an external profiler attached.
+"""
+import contextlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+_local = threading.local()
+
+# Profilers currently using tracemalloc, and whether one of them started it
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+_tracing_owned = False
+
+
+def _acquire_tracing():
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_users += 1
+
+
+def _release_tracing():
+    """Stop tracemalloc once the last profiler using it is done, unless someone else started it"""
+    global _tracing_users, _tracing_owned
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def active():
+    """Profiler running on this thread, or None"""
+    return getattr(_local, "profiler", None)
+
+
+def stage(name):
+    """Context manager timing a nested stage under the active profiler, if any"""
+    profiler = active()
+    return contextlib.nullcontext() if profiler is None else profiler.stage(name)
+
+
+def section(name):
+    """End the current top-level section of the active profiler, if any, and start name"""
+    profiler = active()
+    if profiler is not None:
+        profiler.section(name)
+
+
+def count(name):
+    """Count a call that did no measurable work (e.g. a cache hit) under the active profiler"""
+    profiler = active()
+    if profiler is not None:
+        profiler.count(name)
+
+
+class Profiler:
+    """
+    Wall time, calls, net allocation and peak allocation above the starting point of
+    each stage of one rerun; nested stages are included in their parents' figures.
+    tracemalloc traces the whole process, so memory figures include other sessions
+    running at the same time; it runs while any profiler is active. Call finish() in a
+    finally block so an interrupted or failed rerun still releases it.
+    """
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.stats = {}  # stage -> [calls, seconds, allocated bytes, peak bytes]
+        self.started = None
+        self.seconds = 0.0
+        self._start = 0.0
+        self._stack = []  # [stage, start time, start memory, peak memory]
+        self._section = None
+        self._tracing = False
+        self._running = False
+
+    def start(self):
+        """Activate on the calling thread, finishing any profiler left active on it"""
+        previous = active()
+        if previous is not None:
+            previous.finish()
+        if self.memory:
+            _acquire_tracing()
+            self._tracing = True
+        self._running = True
+        self.started = time.time()
+        self._start = time.perf_counter()
+        _local.profiler = self
+        return self
+
+    def finish(self):
+        """Close open stages and deactivate; calling it again does nothing"""
+        if not self._running:
+            return self
+        self._running = False
+        while self._stack:
+            self._pop()
+        self._section = None
+        self.seconds = time.perf_counter() - self._start
+        if active() is self:
+            _local.profiler = None
+        if self._tracing:
+            _release_tracing()
+            self._tracing = False
+        return self
+
+    def _memory(self):
+        return tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (0, 0)
+
+    def _push(self, name):
+        current, peak = self._memory()
+        if self._stack:
+            # Resetting the peak for this stage must not lose the parent's peak so far
+            self._stack[-1][3] = max(self._stack[-1][3], peak)
+        if tracemalloc.is_tracing():
+            tracemalloc.reset_peak()
+        self._stack.append([name, time.perf_counter(), current, current])
+
+    def _pop(self):
+        name, start, start_memory, peak = self._stack.pop()
+        elapsed = time.perf_counter() - start
+        current, traced_peak = self._memory()
+        peak = max(peak, traced_peak)
+        if self._stack:
+            self._stack[-1][3] = max(self._stack[-1][3], peak)
+
+        stats = self.stats.setdefault(name, [0, 0.0, 0, 0])
+        stats[0] += 1
+        stats[1] += elapsed
+        stats[2] += current - start_memory
+        stats[3] = max(stats[3], peak - start_memory)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def section(self, name):
+        if self._section is not None and self._stack and self._stack[-1][0] == self._section:
+            self._pop()
+        self._push(name)
+        self._section = name
+
+    def count(self, name):
+        self.stats.setdefault(name, [0, 0.0, 0, 0])[0] += 1
+
+    def report(self):
+        """One row per stage, in the order stages first ran"""
+        return [
+            {
+                "Stage": name,
+                "Calls": calls,
+                "Total_ms": seconds * 1000,
+                "Mean_ms": seconds * 1000 / calls,
+                "Allocated_KiB": allocated / 1024,
+                "Peak_KiB": peak / 1024
+            }
+            for name, (calls, seconds, allocated, peak) in self.stats.items()
+        ]
+
+    def record(self, **context):
+        """JSON-ready summary of the rerun, with any extra context fields"""
+        return {
+            "started": time.strftime("%Y-%m-%dT%H:%M:%S%z", time.localtime(self.started)),
+            "wall_ms": self.seconds * 1000,
+            "memory_traced": self.memory,
+            **context,
+            "stages": self.report()
+        }
+
+    def log(self, path=None, **context):
+        """Append the record as one JSON line to path, or log it when no path is given"""
+        line = json.dumps(self.record(**context), default=str)
+        if path:
+            with open(path, "a") as f:
+                f.write(line + "\n")
+        else:
+            logger.info("%s", line)
+
+
+def _frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+class Sampler:
+    """
+    Statistical profile of one thread (the calling one by default): a background
+    thread reads its stack every interval seconds and counts each distinct stack.
+    """
+
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = threading.get_ident() if thread_id is None else thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="dorenth-sampler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    @property
+    def samples(self):
+        return sum(self.stacks.values())
+
+    def top_functions(self, n=25):
+        """
+        Functions that ran in the most samples (self), then by samples with them anywhere
+        on the stack (total), so the frames every sample passes through do not come first
+        """
+        own, total = Counter(), Counter()
+        for stack, hits in self.stacks.items():
+            frames = stack.split(";")
+            own[frames[-1]] += hits
+            for label in set(frames):
+                total[label] += hits
+        samples = self.samples or 1
+        return [
+            {
+                "Function": label,
+                "Self_Samples": own[label],
+                "Total_Samples": hits,
+                "Total_Percent": hits / samples * 100
+            }
+            for label, hits in sorted(total.items(), key=lambda item: (own[item[0]], item[1]), reverse=True)[:n]
+        ]
+
+    def collapsed(self):
+        """Samples in collapsed-stack format ("frame;frame;frame count" per line) for flame graph tools"""
+        return "".join(f"{stack} {hits}\n" for stack, hits in self.stacks.most_common())
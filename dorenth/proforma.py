@@ -0,0 +1,170 @@
+"""
+Pairwise merger pro-forma screen over the whole universe.
+Every acquirer/target pair is scored in acquirer chunks with array arithmetic,
+keeping only a running top-N, so memory stays at O(chunk x companies) however
+many pairs there are. Chunks can be spread across processes.
+"""
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Statement lines the screen reads in the as-of year
+PROFORMA_INPUTS = ["EBITDA", "Revenue", "Total_Debt", "Cash", "Net_Income", "Market_Cap"]
+
+# Acquirers earning less than this share of their market value are left out by default:
+# EPS accretion divides by their earnings, so near-breakeven acquirers rank on noise
+MIN_EARNINGS_YIELD = 0.02
+
+# Above this many pairs the screen fans out across processes when n_jobs is not given
+PARALLEL_PAIRS = 20_000_000
+
+# Pool worker state, set once per process by _init_worker
+_inputs = None
+
+
+def proforma_inputs(panel, codes=None, as_of_year=None):
+    """(companies, PROFORMA_INPUTS) matrix for the screen"""
+    if codes is None:
+        codes = np.arange(len(panel))
+    if as_of_year is None:
+        as_of_year = int(panel.years[-1])
+    return panel.cross_section(codes, PROFORMA_INPUTS, as_of_year)
+
+
+def _pair_metrics(acq, tgt, premium, consideration, cost_of_debt, tax_rate):
+    """
+    Pro-forma metrics of acquirers acq buying targets tgt, whose last axis is
+    PROFORMA_INPUTS; the leading axes broadcast, so (a, 1, 6) against (1, t, 6)
+    scores every pair and two aligned (k, 6) arrays score k given pairs.
+    EPS accretion compares pro-forma with standalone acquirer EPS: an all-stock deal
+    issues shares at the acquirer's market price, a cash deal adds after-tax interest
+    on the purchase price. It is NaN unless the acquirer has positive earnings and value.
+    """
+    ebitda_a, revenue_a, debt_a, cash_a, income_a, cap_a = np.moveaxis(acq, -1, 0)
+    ebitda_t, revenue_t, debt_t, cash_t, income_t, cap_t = np.moveaxis(tgt, -1, 0)
+
+    price = cap_t * (1.0 + premium)
+    combined_ebitda = ebitda_a + ebitda_t
+    net_debt = (debt_a - cash_a) + (debt_t - cash_t)
+    combined_income = income_a + income_t
+    if consideration == "cash":
+        net_debt = net_debt + price
+        combined_income = combined_income - price * cost_of_debt * (1.0 - tax_rate)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        leverage = np.where(combined_ebitda > 0, net_debt / combined_ebitda, np.nan)
+        if consideration == "cash":
+            ratio = combined_income / income_a
+        else:
+            ratio = combined_income * cap_a / (income_a * (cap_a + price))
+        accretion = np.where((income_a > 0) & (cap_a > 0), ratio - 1.0, np.nan)
+
+    return {
+        "combined_ebitda": combined_ebitda,
+        "combined_revenue": revenue_a + revenue_t,
+        "net_debt": net_debt,
+        "leverage": leverage,
+        "price": price,
+        "accretion": accretion
+    }
+
+
+def _screen_chunk(start, stop, inputs, params):
+    """Best pairs among acquirers start:stop, as (scores, acquirer codes, target codes)"""
+    premium, consideration, cost_of_debt, tax_rate, max_leverage, min_earnings_yield, top_n = params
+    acq = inputs[start:stop]
+    metrics = _pair_metrics(acq[:, None], inputs[None], premium, consideration, cost_of_debt, tax_rate)
+
+    score = metrics["accretion"]
+    # A company cannot acquire itself
+    rows = np.arange(stop - start)
+    score[rows, rows + start] = np.nan
+    if max_leverage is not None:
+        score[~(metrics["leverage"] <= max_leverage)] = np.nan
+    if min_earnings_yield is not None:
+        _, _, _, _, income_a, cap_a = acq.T
+        with np.errstate(divide="ignore", invalid="ignore"):
+            earnings_yield = income_a / cap_a
+        score[~(earnings_yield >= min_earnings_yield)] = np.nan
+
+    flat = score.ravel()
+    valid = np.flatnonzero(~np.isnan(flat))
+    if len(valid) > top_n:
+        valid = valid[np.argpartition(flat[valid], -top_n)[-top_n:]]
+    acquirers, targets = np.divmod(valid, score.shape[1])
+    return flat[valid], acquirers + start, targets
+
+
+def _init_worker(inputs):
+    global _inputs
+    _inputs = inputs
+
+
+def _screen_chunk_worker(start, stop, params):
+    return _screen_chunk(start, stop, _inputs, params)
+
+
+def _merge(best, found, top_n):
+    """Fold a chunk's candidates into the running top-N"""
+    scores, acquirers, targets = (np.concatenate(pair) for pair in zip(best, found))
+    if len(scores) > top_n:
+        keep = np.argpartition(scores, -top_n)[-top_n:]
+        scores, acquirers, targets = scores[keep], acquirers[keep], targets[keep]
+    return scores, acquirers, targets
+
+
+def screen_pairs(panel, companies=None, as_of_year=None, premium=0.30, consideration="stock",
+                 cost_of_debt=0.08, tax_rate=0.22, max_leverage=None, min_earnings_yield=MIN_EARNINGS_YIELD,
+                 top_n=100, chunk_size=256, n_jobs=None):
+    """
+    Rank acquirer/target pairs by pro-forma EPS accretion.
+    companies limits the universe (all when None); max_leverage drops pairs whose
+    pro-forma net debt/EBITDA exceeds it; min_earnings_yield drops acquirers whose net
+    income / market cap is below it (None keeps every profitable acquirer); n_jobs > 1
+    spreads chunks over processes (by default only for universes above PARALLEL_PAIRS pairs).
+    """
+    if consideration not in ("stock", "cash"):
+        raise ValueError("consideration must be 'stock' or 'cash'")
+    codes = np.arange(len(panel)) if companies is None else panel.company_codes(companies)
+    inputs = proforma_inputs(panel, codes, as_of_year)
+    n = len(codes)
+
+    params = (premium, consideration, cost_of_debt, tax_rate, max_leverage, min_earnings_yield, top_n)
+    bounds = [(start, min(start + chunk_size, n)) for start in range(0, n, chunk_size)]
+    if n_jobs is None:
+        n_jobs = (os.cpu_count() or 1) if n * n > PARALLEL_PAIRS else 1
+
+    best = (np.empty(0), np.empty(0, dtype=np.intp), np.empty(0, dtype=np.intp))
+    if n_jobs > 1 and len(bounds) > 1:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(n_jobs, mp_context=context, initializer=_init_worker, initargs=(inputs,)) as pool:
+            starts, stops = zip(*bounds)
+            for found in pool.map(_screen_chunk_worker, starts, stops, [params] * len(bounds)):
+                best = _merge(best, found, top_n)
+    else:
+        for start, stop in bounds:
+            best = _merge(best, _screen_chunk(start, stop, inputs, params), top_n)
+
+    scores, acquirers, targets = best
+    order = np.argsort(-scores, kind="stable")
+    acquirers, targets = acquirers[order], targets[order]
+
+    # Full pro-forma detail only for the winning pairs
+    metrics = _pair_metrics(inputs[acquirers], inputs[targets], premium, consideration, cost_of_debt, tax_rate)
+
+    acquirer_codes, target_codes = codes[acquirers], codes[targets]
+    return pd.DataFrame({
+        "Acquirer": panel.names[acquirer_codes],
+        "Acquirer_Industry": panel.industry_labels(acquirer_codes),
+        "Target": panel.names[target_codes],
+        "Target_Industry": panel.industry_labels(target_codes),
+        "Purchase_Price": metrics["price"],
+        "Combined_EBITDA": metrics["combined_ebitda"],
+        "Combined_Revenue": metrics["combined_revenue"],
+        "Pro_Forma_Net_Debt": metrics["net_debt"],
+        "Pro_Forma_Debt_EBITDA": metrics["leverage"],
+        "EPS_Accretion_Percent": metrics["accretion"] * 100
+    })
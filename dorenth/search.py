@@ -0,0 +1,106 @@
+"""
+Company lookup indexes for large universes.
+Industry membership is a precomputed code list per industry, type-ahead search is a
+prefix range in a sorted array of name and ticker tokens, and metric range filters
+bisect a sorted copy of the metric's values in one year. None of them scan every
+company on each keystroke.
+"""
+import threading
+
+import numpy as np
+
+# Metrics offered as range filters in the company selector
+FILTER_METRICS = [
+    "EBITDA",
+    "Revenue",
+    "Market_Cap",
+    "EV_EBITDA_Multiple",
+    "Debt_EBITDA_Ratio",
+    "ROE_Percent"
+]
+
+
+class CompanyIndex:
+    """
+    Industry, name/ticker and metric-range indexes over a panel's companies.
+    Every lookup returns company codes in panel order; sorted metric columns are
+    built on first use per (metric, year) and kept for the life of the index.
+    """
+
+    def __init__(self, panel):
+        self.panel = panel
+
+        order = np.argsort(panel.company_industry, kind="stable")
+        bounds = np.searchsorted(panel.company_industry[order], np.arange(len(panel.industries) + 1))
+        self.members = {ind: order[bounds[g]:bounds[g + 1]] for g, ind in enumerate(panel.industries)}
+
+        # Each word of a name is a token, so "indo" finds "PT Indofood ..." and "unvr" the ticker
+        tokens, owners = [], []
+        for code, name in enumerate(panel.names):
+            for token in set(str(name).lower().split()):
+                tokens.append(token)
+                owners.append(code)
+        tokens = np.array(tokens, dtype=str)
+        order = np.argsort(tokens, kind="stable")
+        self.tokens = tokens[order]
+        self.owners = np.array(owners, dtype=np.intp)[order]
+
+        self._sorted = {}
+        self._lock = threading.Lock()
+
+    def industry_codes(self, industries):
+        """Companies of the given industries, unknown industries skipped"""
+        parts = [self.members[ind] for ind in industries if ind in self.members]
+        return np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+
+    def prefix_codes(self, prefix):
+        """Companies with a name or ticker word starting with prefix (case-insensitive)"""
+        prefix = prefix.lower()
+        lo = np.searchsorted(self.tokens, prefix, side="left")
+        hi = np.searchsorted(self.tokens, prefix + "\U0010ffff", side="left")
+        return np.unique(self.owners[lo:hi])
+
+    def search(self, query, codes=None):
+        """Companies matching every word of query as a prefix, within codes when given"""
+        result = codes
+        for word in str(query or "").split():
+            matches = self.prefix_codes(word)
+            result = matches if result is None else np.intersect1d(result, matches, assume_unique=True)
+        if result is None:
+            return np.arange(len(self.panel))
+        return np.asarray(result, dtype=np.intp)
+
+    def sorted_metric(self, metric, year):
+        """(values, codes) of companies reporting metric in year, ascending by value"""
+        key = (metric, int(year))
+        with self._lock:
+            cached = self._sorted.get(key)
+        if cached is None:
+            column = self.panel.block(metric)[:, self.panel.year_index[int(year)]]
+            valid = np.flatnonzero(~np.isnan(column))
+            order = valid[np.argsort(column[valid], kind="stable")]
+            cached = (column[order], order)
+            with self._lock:
+                self._sorted[key] = cached
+        return cached
+
+    def metric_range(self, metric, year, low=None, high=None):
+        """Companies whose metric in year lies within [low, high]; either bound may be None"""
+        values, codes = self.sorted_metric(metric, year)
+        lo = 0 if low is None else np.searchsorted(values, low, side="left")
+        hi = len(values) if high is None else np.searchsorted(values, high, side="right")
+        return np.sort(codes[lo:hi])
+
+    def filter(self, codes=None, query=None, ranges=(), year=None):
+        """
+        Companies among codes (all when None) matching the search query and every
+        (metric, low, high) range in year (latest by default)
+        """
+        if year is None:
+            year = int(self.panel.years[-1])
+        result = self.search(query, codes)
+        for metric, low, high in ranges:
+            if low is None and high is None:
+                continue
+            result = np.intersect1d(result, self.metric_range(metric, year, low, high), assume_unique=True)
+        return result
@@ -0,0 +1,157 @@
+"""
+Panels backed by named shared memory, so several server processes map one copy.
+A segment is named after a fingerprint of the panel's contents: the first process to
+publish a dataset version copies its values in, every other process that loads the
+same version attaches to those bytes instead of holding its own. Where shared memory
+is unavailable, or has no room for the panel, the panel stays private to the process.
+"""
+import hashlib
+import logging
+import os
+import threading
+import time
+import weakref
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+
+from dorenth.panel import MAPanel
+
+logger = logging.getLogger(__name__)
+
+# Segment layout: a header whose first bytes are written once the values are in place
+HEADER_BYTES = 64
+READY_MAGIC = b"DORENTH1"
+
+# How long an attaching process waits for the creator to finish copying
+READY_TIMEOUT = 10.0
+
+# Segments mapped by this process: name -> [SharedMemory, created here, panels using it]
+_segments = {}
+# Segments whose mapping could not be closed yet because arrays still view them
+_pending = []
+_lock = threading.Lock()
+
+
+def panel_fingerprint(panel):
+    """Content hash of a panel's values and index tables"""
+    digest = hashlib.blake2b(digest_size=12)
+    digest.update(repr((panel.values.shape, panel.companies, panel.metrics, panel.years.tolist())).encode())
+    digest.update(panel.values.data)
+    return digest.hexdigest()
+
+
+def segment_name(fingerprint):
+    # Short enough for the 31-character POSIX limit on macOS
+    return f"dorenth_{fingerprint[:20]}"
+
+
+def _attach(name, nbytes):
+    """Existing segment once its creator has marked it ready, or None"""
+    shm = SharedMemory(name=name)
+    # Attaching registers the segment with this process's resource tracker, which
+    # would unlink it at exit while other workers still use it; only the creator owns it
+    resource_tracker.unregister(shm._name, "shared_memory")
+    deadline = time.monotonic() + READY_TIMEOUT
+    while bytes(shm.buf[:len(READY_MAGIC)]) != READY_MAGIC:
+        if time.monotonic() > deadline:
+            shm.close()
+            return None
+        time.sleep(0.01)
+    if shm.size < HEADER_BYTES + nbytes:
+        shm.close()
+        return None
+    return shm
+
+
+def _reserve(shm):
+    """
+    Allocate the segment's pages up front. Creating it only sets its size, so on a full
+    /dev/shm the copy would fault with SIGBUS, which no except clause can catch; an
+    allocation failure here is an OSError instead.
+    """
+    if hasattr(os, "posix_fallocate"):
+        os.posix_fallocate(shm._fd, 0, shm.size)
+
+
+def _create(name, values):
+    shm = SharedMemory(name=name, create=True, size=HEADER_BYTES + values.nbytes)
+    try:
+        _reserve(shm)
+    except OSError:
+        shm.close()
+        shm.unlink()
+        raise
+    _view(shm, values.shape)[...] = values
+    shm.buf[:len(READY_MAGIC)] = READY_MAGIC
+    return shm
+
+
+def _view(shm, shape):
+    # frombuffer keeps a buffer export on the segment, so it cannot be closed under a live array
+    count = int(np.prod(shape))
+    return np.frombuffer(shm.buf, dtype=np.float64, count=count, offset=HEADER_BYTES).reshape(shape)
+
+
+def _open(name, values):
+    """Segment for name mapped in this process, created or attached on first use"""
+    with _lock:
+        entry = _segments.get(name)
+        if entry is None:
+            try:
+                shm, owner = _create(name, values), True
+            except FileExistsError:
+                shm, owner = _attach(name, values.nbytes), False
+            if shm is None:
+                return None
+            entry = _segments[name] = [shm, owner, 0]
+        entry[2] += 1
+        return entry[0]
+
+
+def _release(name):
+    """Drop a panel's use of a segment; the last one closes it (and, in the creator, unlinks it)"""
+    with _lock:
+        entry = _segments[name]
+        entry[2] -= 1
+        if entry[2]:
+            return
+        del _segments[name]
+        shm, owner = entry[0], entry[1]
+        if owner:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+        _pending.append(shm)
+        for segment in list(_pending):
+            try:
+                segment.close()
+            except BufferError:
+                # An array from a released panel is still alive; retry on the next release
+                continue
+            _pending.remove(segment)
+
+
+def share_panel(panel):
+    """
+    Equivalent panel whose values live in a shared memory segment, created or attached
+    by content fingerprint. Returns the panel unchanged when no segment can be used.
+    """
+    name = segment_name(panel_fingerprint(panel))
+    try:
+        shm = _open(name, panel.values)
+    except (OSError, ValueError) as exc:
+        logger.warning("Shared memory unavailable, keeping a private copy: %s", exc)
+        return panel
+    if shm is None:
+        logger.warning("Shared segment %s never became ready, keeping a private copy", name)
+        return panel
+
+    values = _view(shm, panel.values.shape)
+    shared = MAPanel(values, panel.companies, panel.names, panel.company_industry, panel.industries,
+                     panel.metrics, panel.years, panel.formulas)
+    shared.segment = name
+    weakref.finalize(shared, _release, name)
+    return shared
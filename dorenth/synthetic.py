@@ -0,0 +1,143 @@
+"""
+Seeded synthetic company universes for testing the app at production scale.
+Companies get a revenue path with trend growth and yearly shocks, an industry-flavoured
+EBITDA margin, valuation multiple and leverage, and the embedded data's twelve metrics
+derived consistently from those; any further metrics are independent random series.
+The same universe comes out as a panel, as records in get_embedded_ma_data's layout,
+or as a folder of workbooks the loader reads.
+"""
+import math
+import os
+from collections import namedtuple
+
+import numpy as np
+
+from dorenth.panel import MAPanel, company_key
+
+# The embedded data's metrics, in its order
+CORE_METRICS = [
+    "EBITDA", "Revenue", "Enterprise_Value", "Market_Cap",
+    "Net_Income", "Total_Assets", "Total_Debt", "Cash",
+    "EV_EBITDA_Multiple", "PE_Ratio", "Debt_EBITDA_Ratio", "ROE_Percent"
+]
+
+# Industries named first, before numbered ones
+INDUSTRY_NAMES = ["Food", "Chemical", "Mobility"]
+
+# Axes and values of one generated universe; values[c, m, y] like MAPanel.values
+Universe = namedtuple("Universe", ["industries", "names", "company_industry", "metrics", "years", "values"])
+
+
+def _tickers(n):
+    """n distinct upper-case tickers, four letters or more"""
+    width = max(4, math.ceil(math.log(max(n, 2), 26)))
+    codes = np.arange(n)[:, None] // 26 ** np.arange(width - 1, -1, -1) % 26
+    return ["".join(chr(65 + c) for c in row) for row in codes]
+
+
+def generate_universe(n_companies=1000, n_metrics=12, n_years=5, n_industries=3, seed=0,
+                      start_year=2020, missing_rate=0.0):
+    """
+    Universe of n_companies split evenly, in contiguous runs, over n_industries, with
+    n_metrics metrics (the core metrics first) over n_years from start_year. The same
+    arguments always give the same universe; missing_rate blanks that share of cells.
+    """
+    rng = np.random.default_rng(seed)
+    n, y = n_companies, n_years
+    industries = [INDUSTRY_NAMES[i] if i < len(INDUSTRY_NAMES) else f"Industry_{i + 1}" for i in range(n_industries)]
+    company_industry = np.arange(n) * n_industries // max(n, 1)
+    names = [f"PT_Synthetic_{ticker}" for ticker in _tickers(n)]
+
+    # Industry traits, then each company's draw around them
+    industry_margin = rng.uniform(0.08, 0.3, n_industries)[company_industry]
+    industry_multiple = rng.uniform(6.0, 12.0, n_industries)[company_industry]
+    industry_leverage = rng.uniform(0.5, 3.0, n_industries)[company_industry]
+
+    growth = rng.normal(0.06, 0.04, (n, 1)) + rng.normal(0.0, 0.05, (n, y))
+    revenue = rng.lognormal(math.log(20.0), 1.2, (n, 1)) * np.cumprod(1.0 + growth, axis=1)
+    margin = np.clip(industry_margin[:, None] + rng.normal(0.0, 0.05, (n, 1)) + rng.normal(0.0, 0.01, (n, y)), 0.02, 0.6)
+    ebitda = revenue * margin
+    multiple = industry_multiple[:, None] * rng.lognormal(0.0, 0.2, (n, 1)) * rng.lognormal(0.0, 0.05, (n, y))
+    enterprise_value = ebitda * multiple
+    total_debt = ebitda * industry_leverage[:, None] * rng.lognormal(0.0, 0.4, (n, 1))
+    cash = revenue * rng.uniform(0.03, 0.2, (n, 1))
+    market_cap = np.maximum(enterprise_value - total_debt + cash, 0.1 * enterprise_value)
+    # Mostly profitable, with a tail of loss makers
+    net_income = ebitda * rng.normal(0.4, 0.2, (n, y))
+    total_assets = revenue * rng.uniform(0.6, 2.0, (n, 1))
+    equity = np.maximum(total_assets - total_debt, 0.2 * total_assets)
+
+    core = {
+        "EBITDA": ebitda,
+        "Revenue": revenue,
+        "Enterprise_Value": enterprise_value,
+        "Market_Cap": market_cap,
+        "Net_Income": net_income,
+        "Total_Assets": total_assets,
+        "Total_Debt": total_debt,
+        "Cash": cash,
+        "EV_EBITDA_Multiple": enterprise_value / ebitda,
+        "PE_Ratio": market_cap / net_income,
+        "Debt_EBITDA_Ratio": total_debt / ebitda,
+        "ROE_Percent": net_income / equity * 100
+    }
+    metrics = CORE_METRICS[:n_metrics] + [f"Metric_{m + 1}" for m in range(len(CORE_METRICS), n_metrics)]
+
+    values = np.empty((n, len(metrics), y))
+    for m, metric in enumerate(metrics):
+        if metric in core:
+            values[:, m] = core[metric]
+        else:
+            values[:, m] = rng.lognormal(0.0, 1.0, (n, 1)) * np.cumprod(1.0 + rng.normal(0.03, 0.1, (n, y)), axis=1)
+    if missing_rate:
+        values[rng.random(values.shape) < missing_rate] = np.nan
+
+    years = list(range(start_year, start_year + y))
+    return Universe(industries, names, company_industry, metrics, years, values)
+
+
+def synthetic_panel(*args, **kwargs):
+    """Panel of generate_universe(*args, **kwargs), keyed like a loaded dataset"""
+    u = generate_universe(*args, **kwargs)
+    companies = [company_key(u.industries[g], name) for g, name in zip(u.company_industry, u.names)]
+    names = [name.replace("_", " ") for name in u.names]
+    return MAPanel(u.values, companies, names, u.company_industry, u.industries, u.metrics, u.years)
+
+
+def synthetic_records(*args, **kwargs):
+    """
+    ({industry: {company: {metric: [values per year]}}}, years) of generate_universe,
+    the layout get_embedded_ma_data passes to build_panel
+    """
+    u = generate_universe(*args, **kwargs)
+    records = {industry: {} for industry in u.industries}
+    for c, name in enumerate(u.names):
+        rows = u.values[c].tolist()
+        records[u.industries[u.company_industry[c]]][name] = dict(zip(u.metrics, rows))
+    return records, u.years
+
+
+def write_workbooks(directory, *args, **kwargs):
+    """
+    Write generate_universe as <directory>/<Industry>/<Company>.xlsx in the layout the
+    loader reads (metric names in column B, years across row 3 from column C), one
+    workbook per company; returns the paths written
+    """
+    from openpyxl import Workbook
+
+    u = generate_universe(*args, **kwargs)
+    paths = []
+    for industry in u.industries:
+        os.makedirs(os.path.join(directory, industry), exist_ok=True)
+    for c, name in enumerate(u.names):
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet("Sheet1")
+        sheet.append([])
+        sheet.append([])
+        sheet.append([None, "Financial Summary"] + u.years)
+        for metric, row in zip(u.metrics, u.values[c].tolist()):
+            sheet.append([None, metric] + [None if v != v else v for v in row])
+        path = os.path.join(directory, u.industries[u.company_industry[c]], f"{name}.xlsx")
+        workbook.save(path)
+        paths.append(path)
+    return paths
@@ -0,0 +1,176 @@
+"""Comparable-multiple valuation of M&A targets"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from dorenth.aggregates import AggregateStore
+
+# Percentiles reported for simulated enterprise value
+PERCENTILES = (5, 25, 50, 75, 95)
+
+SimulationResult = namedtuple("SimulationResult", [
+    "n_draws", "n_comparables", "mean", "std", "percentiles", "hist_counts", "hist_edges"
+])
+
+
+def comparable_stats(panel, codes=None, as_of_year=None, pooled=False, aggregates=None):
+    """
+    Comparable statistics per industry in the as-of year (latest by default):
+    peer count, min/mean/max EV/EBITDA and mean EV/Revenue over the given peers (all when None).
+    pooled puts every peer in one group (index 0) whatever its industry.
+    Read from an AggregateStore, built on the fly when aggregates is not given.
+    """
+    if aggregates is None:
+        aggregates = AggregateStore(panel)
+    if as_of_year is None:
+        as_of_year = int(panel.years[-1])
+    companies = None if codes is None else [panel.companies[c] for c in codes]
+
+    if pooled:
+        stats = aggregates.pooled(companies, as_of_year)
+        groups = {} if stats is None else {0: stats}
+    else:
+        groups = aggregates.stats(companies, as_of_year)
+
+    ev_ebitda = aggregates.metric_index["EV_EBITDA_Multiple"]
+    ev_revenue = aggregates.metric_index["EV_Revenue_Multiple"]
+    return pd.DataFrame({
+        "comparable_count": [int(s.count[ev_ebitda]) for s in groups.values()],
+        "ev_ebitda_min": [s.minimum[ev_ebitda] for s in groups.values()],
+        "ev_ebitda_mean": [s.mean[ev_ebitda] for s in groups.values()],
+        "ev_ebitda_max": [s.maximum[ev_ebitda] for s in groups.values()],
+        "ev_revenue_mean": [s.mean[ev_revenue] for s in groups.values()]
+    }, index=pd.Index(list(groups), name="industry"))
+
+
+def match_industries(panel, industries):
+    """
+    Panel industry name of each value, matched after stripping whitespace and then
+    case-insensitively; values matching no industry are returned stripped
+    """
+    exact = set(panel.industries)
+    folded = {}
+    for industry in panel.industries:
+        folded.setdefault(industry.casefold(), industry)
+    names = pd.Series(industries, dtype=object).astype(str).str.strip()
+    return names.map(lambda name: name if name in exact else folded.get(name.casefold(), name))
+
+
+def unmatched_industries(panel, industries):
+    """Distinct values among industries that name no industry of the panel, sorted"""
+    known = set(panel.industries)
+    return sorted({name for name in industries if name not in known})
+
+
+def value_targets(panel, targets, peers=None, as_of_year=None, aggregates=None):
+    """
+    Value many targets at once from industry comparables.
+    targets needs industry and ebitda columns (revenue optional, names case-insensitive);
+    industry values are matched to the panel's industries ignoring surrounding spaces
+    and case, and rows naming no known industry get no valuation (see unmatched_industries).
+    peers restricts the comparable set to these company keys. Comparable stats are
+    computed once per industry and broadcast to every target.
+    """
+    targets = targets.rename(columns=lambda c: str(c).strip().lower())
+    missing = {"industry", "ebitda"} - set(targets.columns)
+    if missing:
+        raise ValueError(f"targets are missing column(s): {', '.join(sorted(missing))}")
+    targets = targets.assign(industry=match_industries(panel, targets["industry"]).to_numpy())
+
+    codes = None if peers is None else panel.company_codes(peers)
+    stats = comparable_stats(panel, codes, as_of_year, aggregates=aggregates)
+
+    return _apply_multiples(targets.join(stats, on="industry"))
+
+
+def value_against_peers(panel, peers, ebitda, revenue=None, as_of_year=None, aggregates=None):
+    """Value one target against an explicit peer set (e.g. nearest neighbours), whatever their industries"""
+    codes = panel.company_codes(peers)
+    stats = comparable_stats(panel, codes, as_of_year, pooled=True, aggregates=aggregates)
+    target = pd.DataFrame({"ebitda": [ebitda], "revenue": [revenue]}, index=[0])
+    return _apply_multiples(target.join(stats)).iloc[0]
+
+
+def _apply_multiples(out):
+    """Valuation columns from targets joined to their comparable stats"""
+    out["comparable_count"] = out["comparable_count"].fillna(0).astype(int)
+    ebitda = out["ebitda"].astype(float)
+    out["conservative_valuation"] = ebitda * out["ev_ebitda_min"]
+    out["average_valuation"] = ebitda * out["ev_ebitda_mean"]
+    out["optimistic_valuation"] = ebitda * out["ev_ebitda_max"]
+    if "revenue" in out:
+        out["revenue_valuation"] = out["revenue"].astype(float) * out["ev_revenue_mean"]
+    return out
+
+
+def comparable_multiples(panel, codes):
+    """
+    Paired EV/EBITDA and EV/Revenue multiples of the given peers across every year.
+    Peer-years without a positive EV/EBITDA multiple are dropped; EV/Revenue is
+    NaN where revenue or enterprise value is missing.
+    """
+    codes = np.asarray(codes, dtype=np.intp)
+    ev_ebitda = panel.block("EV_EBITDA_Multiple")[codes].ravel()
+    ev_revenue = panel.block("EV_Revenue_Multiple")[codes].ravel()
+
+    keep = ev_ebitda > 0
+    return ev_ebitda[keep], ev_revenue[keep]
+
+
+def _lognormal_factor(z, sigma):
+    """Mean-one lognormal multipliers from standard normal draws z, computed in place"""
+    z *= sigma
+    z -= sigma * sigma / 2
+    return np.exp(z, out=z)
+
+
+def simulate_valuation(ebitda_multiples, revenue_multiples, target_ebitda, target_revenue,
+                       n_draws=1_000_000, ebitda_uncertainty=0.10, revenue_uncertainty=0.10,
+                       correlation=0.5, ebitda_weight=0.5, bins=60, seed=None):
+    """
+    Monte Carlo distribution of the target's enterprise value.
+    Each draw resamples one comparable peer-year (keeping its EV/EBITDA and EV/Revenue
+    multiples paired) and scales target EBITDA and revenue by correlated mean-one
+    lognormal factors, exp(sigma * z - sigma**2 / 2) with sigma the uncertainty, so
+    neither can turn negative however wide the uncertainty. Implied EV blends the EBITDA and revenue approaches by ebitda_weight;
+    peer-years lacking EV/Revenue fall back to the EBITDA approach alone.
+    """
+    ebitda_multiples = np.asarray(ebitda_multiples, dtype=np.float64)
+    revenue_multiples = np.asarray(revenue_multiples, dtype=np.float64)
+    if len(ebitda_multiples) == 0:
+        raise ValueError("no comparable multiples to sample from")
+
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(ebitda_multiples), size=n_draws)
+
+    z_ebitda = rng.standard_normal(n_draws)
+    z_revenue = rng.standard_normal(n_draws)
+    z_revenue *= np.sqrt(1.0 - correlation ** 2)
+    z_revenue += correlation * z_ebitda
+
+    ev = ebitda_multiples[picks]
+    ev *= target_ebitda * _lognormal_factor(z_ebitda, ebitda_uncertainty)
+
+    if ebitda_weight < 1.0:
+        ev_revenue = revenue_multiples[picks]
+        ev_revenue *= target_revenue * _lognormal_factor(z_revenue, revenue_uncertainty)
+        # Blend in place: ev + (1 - w) * (ev_revenue - ev), skipped where EV/Revenue is missing
+        ev_revenue -= ev
+        ev_revenue *= 1.0 - ebitda_weight
+        np.add(ev, ev_revenue, out=ev, where=~np.isnan(ev_revenue))
+
+    # One partition pass for the bands and the central 99% the histogram is clipped to,
+    # so a few extreme draws do not flatten it
+    *bands, low, high = np.percentile(ev, PERCENTILES + (0.5, 99.5))
+    counts, edges = np.histogram(ev, bins=bins, range=(low, high))
+
+    return SimulationResult(
+        n_draws=n_draws,
+        n_comparables=len(ebitda_multiples),
+        mean=float(ev.mean()),
+        std=float(ev.std()),
+        percentiles=dict(zip(PERCENTILES, map(float, bands))),
+        hist_counts=counts,
+        hist_edges=edges
+    )
@@ -0,0 +1,152 @@
+"""
+Background reload of a watched data directory.
+Only added or changed workbooks are re-ingested; each refresh publishes a new
+immutable Snapshot with a single reference swap, so readers see either the old
+universe or the new one, never a mix.
+"""
+import logging
+import os
+import threading
+from collections import namedtuple
+
+from dorenth.ingest import collect_blocks, discover_workbooks, open_cache, parse_jobs, parse_jobs_cached
+from dorenth.panel import assemble_panel, company_key
+from dorenth.shared import share_panel
+
+logger = logging.getLogger(__name__)
+
+# Everything a session reads from one version of the dataset
+Snapshot = namedtuple("Snapshot", ["panel", "errors", "aggregates", "version"])
+
+
+class StaticDataset:
+    """Fixed dataset behind the same snapshot() interface as DatasetWatcher"""
+
+    def __init__(self, panel, derive=None, share=False):
+        if share:
+            panel = share_panel(panel)
+        self._snapshot = Snapshot(panel, [], derive(panel) if derive else None, 1)
+
+    def snapshot(self):
+        return self._snapshot
+
+
+class DatasetWatcher:
+    """
+    Keeps a panel in sync with a data directory.
+    derive(panel, previous, changed) computes the aggregates published alongside each
+    panel; after the first load it also gets the previous version's aggregates and the
+    company keys added, edited or removed since, so it can update rather than rebuild.
+    With share, each panel's values are published in shared memory for other processes
+    watching the same data.
+    """
+
+    def __init__(self, directory, default_industry="Other", sheet_name="Sheet1",
+                 cache_dir=None, interval=10.0, max_workers=None, derive=None, share=False):
+        self.directory = directory
+        self.default_industry = default_industry
+        self.sheet_name = sheet_name
+        self.interval = interval
+        self.max_workers = max_workers
+        self.derive = derive
+        self.share = share
+        self.cache = open_cache(cache_dir, directory)
+
+        self._signatures = {}  # path -> (mtime_ns, size) when last ingested
+        self._results = {}     # path -> (job, parsed, error)
+        self._keys = {}        # path -> cache key
+        self._snapshot = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+        self.refresh()
+
+    def snapshot(self):
+        """Current dataset; a plain attribute read, so it is always a complete version"""
+        return self._snapshot
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="dorenth-watcher", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.refresh()
+            except Exception:
+                # Keep serving the last good snapshot and try again next tick
+                logger.exception("Reloading %s failed", self.directory)
+
+    def _scan(self):
+        """Workbook jobs currently on disk with their stat signatures"""
+        found = {}
+        for job in discover_workbooks(self.directory, self.default_industry):
+            try:
+                st = os.stat(job.path)
+            except FileNotFoundError:
+                continue
+            found[job.path] = (job, (st.st_mtime_ns, st.st_size))
+        return found
+
+    def refresh(self):
+        """Re-ingest added or changed workbooks and drop deleted ones; True when a new snapshot was published"""
+        with self._refresh_lock:
+            found = self._scan()
+            changed = [job for path, (job, sig) in found.items() if self._signatures.get(path) != sig]
+            removed = [path for path in self._signatures if path not in found]
+            if self._snapshot is not None and not changed and not removed:
+                return False
+
+            # Companies whose workbooks changed or went away, under their old and new keys
+            old_jobs = [self._results[path][0] for path in removed]
+            old_jobs += [self._results[job.path][0] for job in changed if job.path in self._results]
+            touched = {company_key(job.industry, job.name) for job in old_jobs + changed}
+
+            keys_before = set(self._keys.values())
+            if self.cache is None:
+                results = list(parse_jobs(changed, self.sheet_name, self.max_workers))
+            else:
+                results, keys = parse_jobs_cached(changed, self.cache, self.sheet_name, self.max_workers)
+                self._keys.update(keys)
+            for path in removed:
+                del self._signatures[path], self._results[path]
+                self._keys.pop(path, None)
+            for result in results:
+                path = result[0].path
+                self._signatures[path] = found[path][1]
+                self._results[path] = result
+            if self.cache is not None and self._snapshot is None:
+                # First load: also drops entries of workbooks deleted while nothing was watching
+                self.cache.prune(set(self._keys.values()))
+            elif self.cache is not None:
+                # Drop cache entries that no workbook points at any more
+                for key in keys_before - set(self._keys.values()):
+                    self.cache.discard(key)
+
+            # Rebuild in discovery order so the panel layout does not depend on edit history
+            blocks, errors = collect_blocks(self._results[path] for path in found)
+            panel = assemble_panel(blocks)
+            if self.share:
+                panel = share_panel(panel)
+            if self.derive is None:
+                aggregates = None
+            elif self._snapshot is None:
+                aggregates = self.derive(panel)
+            else:
+                aggregates = self.derive(panel, self._snapshot.aggregates, touched)
+            version = 1 if self._snapshot is None else self._snapshot.version + 1
+            self._snapshot = Snapshot(panel, errors, aggregates, version)
+
+            logger.info("Loaded %s v%d: %d changed, %d removed, %d errors",
+                        self.directory, version, len(changed), len(removed), len(errors))
+            return True
@@ -0,0 +1,29 @@
+import numpy as np
+
+from dorenth.panel import MAPanel, company_key
+from dorenth.proforma import PROFORMA_INPUTS, screen_pairs
+
+
+def proforma_panel(rows):
+    """One-year panel of PROFORMA_INPUTS from {name: [EBITDA, Revenue, Total_Debt, Cash, Net_Income, Market_Cap]}"""
+    names = list(rows)
+    values = np.array([rows[name] for name in names], dtype=float)[:, :, None]
+    companies = [company_key("Food", name) for name in names]
+    return MAPanel(values, companies, names, np.zeros(len(names), dtype=int), ["Food"], PROFORMA_INPUTS, [2024])
+
+
+def test_near_breakeven_acquirer_is_screened_out():
+    panel = proforma_panel({
+        "Breakeven": [10.0, 50.0, 5.0, 2.0, 0.01, 100.0],
+        "Steady": [20.0, 80.0, 10.0, 5.0, 8.0, 120.0],
+        "Target": [15.0, 60.0, 8.0, 3.0, 6.0, 90.0]
+    })
+
+    unfloored = screen_pairs(panel, min_earnings_yield=None, n_jobs=1)
+    assert unfloored["Acquirer"].iloc[0] == "Breakeven"
+    assert unfloored["EPS_Accretion_Percent"].iloc[0] > 10_000
+
+    pairs = screen_pairs(panel, n_jobs=1)
+    assert "Breakeven" not in set(pairs["Acquirer"])
+    assert set(pairs["Acquirer"]) == {"Steady", "Target"}
+    assert pairs["EPS_Accretion_Percent"].max() < 100